@@ -1,7 +1,11 @@
 """main file to start athany app instance"""
-import src.athany
+import multiprocessing
 
 if __name__ == "__main__":
+    # the audio player runs in a spawned process, which re-imports this file as __mp_main__,
+    # the app is only imported here so that the player process doesn't load the GUI
+    multiprocessing.freeze_support()
+    import src.athany
 
     RESTART_APP = True
     while RESTART_APP:
@@ -19,4 +23,6 @@ if __name__ == "__main__":
             if app.chosen_theme:  # if user changed theme in settings, save his choice
                 app.settings["-theme-"] = app.chosen_theme
 
+        # write pending settings before the next app instance reads them
+        app.settings.flush()
         RESTART_APP = app.restart_app
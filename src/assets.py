@@ -0,0 +1,28 @@
+"""
+module that lazily loads the application data assets, each asset is read from disk
+once on first use & shared by every module that needs it
+"""
+import os
+import functools
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+
+ASSET_FILES = {
+    "app_icon": "app_icon.dat",
+    "settings_icon": "settings.dat",
+    "download_icon": "download.dat",
+    "toggle_off": "toggle_off.dat",
+    "toggle_on": "toggle_on.dat",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get(name: str) -> bytes:
+    """function to get the contents of a data asset
+
+    :param str name: asset name as in ASSET_FILES
+    :return bytes: asset file contents (base64 encoded images)
+    """
+    with open(os.path.join(DATA_DIR, ASSET_FILES[name]), mode="rb") as asset:
+        return asset.read()
@@ -1,13 +1,18 @@
 import os
 import json
 import sys
+import time
 
-import requests
-import hijridate as hj
-from src.elements import sg, mixer
+from src import assets, audio, geocoding, network
+from src.catalog import get_catalog
+from src.elements import sg
 from src.elements import SettingsWindow, MainWindow, ChooseLocationWindow
 from src.elements import TranslatedText, TranslatedButton
+from src.locations import LocationMonitor, monitored_location
 from src.modifiedpt import ModifiedPrayerTimes
+from src.hijri import HijriDateService
+from src.settings import SettingsStore
+from src.state import StateFile
 from src.translator import Translator
 if sys.platform == "win32":
     # library for system notifications on Windows
@@ -17,29 +22,16 @@ if sys.platform == "win32":
 
 DATA_DIR = os.path.join(os.path.dirname(
     os.path.abspath(__file__)), "Data")
-ATHANS_DIR = os.path.join(DATA_DIR, "Athans")
 TRANSLATIONS_DIR = os.path.join(DATA_DIR, "Translations")
 
-with open(os.path.join(DATA_DIR, "app_icon.dat"), mode="rb") as icon:
-    APP_ICON = icon.read()
-with open(os.path.join(DATA_DIR, "settings.dat"), mode="rb") as icon:
-    SETTINGS_ICON = icon.read()
-with open(os.path.join(DATA_DIR, "download.dat"), mode="rb") as down:
-    DOWNLOAD_ICON_B64 = down.read()
-with open(os.path.join(DATA_DIR, "toggle_off.dat"), mode="rb") as toff:
-    TOGGLE_OFF_B64 = toff.read()
-with open(os.path.join(DATA_DIR, "toggle_on.dat"), mode="rb") as ton:
-    TOGGLE_ON_B64 = ton.read()
-with open(os.path.join(DATA_DIR, "available_athans.txt"), encoding="utf-8") as fd:
-    AVAILABLE_ATHANS = fd.read().strip().split("\n")
-
 
 class Athany:
     """Python application to fetch prayer times, display them in a GUI and play adhan"""
     # ------------------------- default app settings ------------------------- #
 
     def __init__(self) -> None:
-        self.settings = sg.UserSettings(
+        self.athans = get_catalog()
+        self.settings = SettingsStore(
             filename="athany-config.json", path=DATA_DIR)
 
         if not self.settings["-theme-"]:
@@ -55,6 +47,8 @@ class Athany:
                                          "-Maghrib-": 0, "-Isha-": 0}
         if not self.settings["-custom-angles-"]:
             self.settings["-custom-angles-"] = [18, 18]
+        if not self.settings["-locations-"]:
+            self.settings["-locations-"] = []
 
         if not self.settings["-mute-athan-"]:
             self.settings["-mute-athan-"] = False
@@ -62,10 +56,42 @@ class Athany:
             self.settings["-use-custom-athan-"] = False
         if not self.settings["-custom-athan-"]:
             self.settings["-custom-athan-"] = "None"
+        if self.settings["-prearm-seconds-"] is None:
+            self.settings["-prearm-seconds-"] = 30
         if not self.settings["-athan-sound-"] or \
-                self.settings["-athan-sound-"] not in os.listdir(ATHANS_DIR):
+                not self.athans.is_available(self.settings["-athan-sound-"]):
             self.settings["-athan-sound-"] = "Abdul-Basit_(Takbeer_only).mp3"
 
+        self.set_fonts()
+
+        self.location_api = None
+        self.restart_app, self.save_loc_check = False, False
+        self.translator = Translator(self.settings["-lang-"], TRANSLATIONS_DIR)
+        self.api_endpoint = "http://api.aladhan.com/v1/timingsByCity"
+        self.displayed_times = ["Fajr", "Sunrise",
+                                "Dhuhr", "Asr", "Maghrib", "Isha"]
+
+        self.chosen_theme = None
+        sg.set_global_icon(assets.get("app_icon"))
+        sg.theme(self.settings["-theme-"])
+        self.available_themes = ["DarkAmber", "DarkBlack1", "DarkBlue13",
+                                 "DarkBlue17", "DarkBrown", "DarkBrown2",
+                                 "DarkBrown7", "DarkGreen7", "DarkGrey2",
+                                 "DarkGrey5", "DarkGrey8", "DarkGrey10",
+                                 "DarkGrey11", "DarkGrey13", "DarkPurple7",
+                                 "DarkTeal10", "DarkTeal11"]
+
+        self.pt = None
+        self.locations = None
+        self.hijri = None
+        self.init_layout = None
+        self.window = None
+
+        # self.calculation_data will either be a dict (api json response) or None
+        self.calculation_data = self.choose_location_if_not_saved()
+
+    def set_fonts(self):
+        """method to set the fonts used by the app windows depending on the platform & app language"""
         if sys.platform != "win32":
             self.GUI_FONT = ("Readex Pro", 11)
             self.HIJRI_DATE_FONT = ("Arabic Typesetting", 20)
@@ -89,29 +115,13 @@ class Athany:
                 self.BUTTON_FONT = ("Helvetica", 9)
                 self.settings_button_width = 6
 
-        self.location_api = None
-        self.restart_app, self.save_loc_check = False, False
-        self.translator = Translator(self.settings["-lang-"], TRANSLATIONS_DIR)
-        self.api_endpoint = " http://api.aladhan.com/v1/timingsByCity"
-        self.displayed_times = ["Fajr", "Sunrise",
-                                "Dhuhr", "Asr", "Maghrib", "Isha"]
-
-        self.chosen_theme = None
-        sg.set_global_icon(APP_ICON)
+    def apply_appearance(self):
+        """method to apply the theme & language saved in the settings to the windows created afterwards,
+        the prayer times, location data, audio player & network session are kept as they are"""
         sg.theme(self.settings["-theme-"])
-        self.available_themes = ["DarkAmber", "DarkBlack1", "DarkBlue13",
-                                 "DarkBlue17", "DarkBrown", "DarkBrown2",
-                                 "DarkBrown7", "DarkGreen7", "DarkGrey2",
-                                 "DarkGrey5", "DarkGrey8", "DarkGrey10",
-                                 "DarkGrey11", "DarkGrey13", "DarkPurple7",
-                                 "DarkTeal10", "DarkTeal11"]
-
-        self.pt = None
-        self.init_layout = None
-        self.window = None
-
-        # self.calculation_data will either be a dict (api json response) or None
-        self.calculation_data = self.choose_location_if_not_saved()
+        if self.translator.lang != self.settings["-lang-"]:
+            self.translator = Translator(self.settings["-lang-"], TRANSLATIONS_DIR)
+        self.set_fonts()
 
     # ---------------------------- static methods ---------------------------- #
 
@@ -120,38 +130,11 @@ class Athany:
         """ function that gets the current city and country of the user IP\n
         :return: (Tuple[str, str]) tuple containing 2 strings of the city & country fetched
         """
-        try:
-            ipinfo_res = requests.get(
-                "https://ipinfo.io/json", timeout=5)
-
-            if ipinfo_res.status_code == 200:
-                ipinfo_json = ipinfo_res.json()
-                ret_val = (ipinfo_json["city"], ipinfo_json["country"])
-            else:
-                ipgeoloc_res = requests.get(
-                    "https://api.ipgeolocation.io/ipgeo?apiKey=397b014528ba421cafcc5df4d00c9e9a", timeout=5)
-
-                if ipgeoloc_res.status_code == 200:
-                    ipgeoloc_json = ipgeoloc_res.json()
-                    ret_val = (ipgeoloc_json["city"],
-                               ipgeoloc_json["country_code2"])
-                else:
-                    raise requests.exceptions.ConnectionError
-
-        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
-            ret_val = "RequestError"
+        location = network.locate()
+        ret_val = location if location is not None else "RequestError"
 
         return ret_val
 
-    @staticmethod
-    def get_hijri_date() -> str:
-        """function to return arabic hijri date string to display in main window
-        :return: (str) Arabic string of current Hijri date
-        """
-        hijri_date = hj.Gregorian.today().to_hijri()
-        unformatted_text = f"{hijri_date.day_name(language='ar')} {hijri_date.day} {hijri_date.month_name(language='ar')} {hijri_date.year}"
-        return Translator.display_ar_text(text=unformatted_text)
-
     # -------------------------- window generators -------------------------- #
 
     def generate_location_window(self):
@@ -193,15 +176,13 @@ class Athany:
                                     font=self.GUI_FONT)
 
     def generate_settings_window(self):
-        """method to generate the settings window layout based on app language
+        """method to generate the settings window layout based on app language,
+        only the general settings tab is built here, the other tabs are built when first selected
 
         :return SettingsWindow: settings window object
         """
         current_athan = "Custom" if self.settings["-use-custom-athan-"] \
-            else self.settings["-athan-sound-"][:-4].replace("_", " ")
-
-        method = self.pt.calculation_methods.get(
-            self.settings["-used-method-"], self.pt.calculation_methods[4])[1]
+            else self.athans.display_name(self.settings["-athan-sound-"])
 
         # tab 1 contains application settings
         app_settings_tab = self.translator.adjust_layout_direction([
@@ -211,7 +192,7 @@ class Athany:
                         TranslatedText(self.translator,
                                        "Mute athan", pad=0),
                         sg.Push(),
-                        sg.Button(image_data=TOGGLE_ON_B64 if self.settings["-mute-athan-"] else TOGGLE_OFF_B64,
+                        sg.Button(image_data=assets.get("toggle_on") if self.settings["-mute-athan-"] else assets.get("toggle_off"),
                                   key="-TOGGLE-MUTE-", pad=(5, 0), button_color=(sg.theme_background_color(), sg.theme_background_color()),
                                   border_width=0, metadata=self.settings["-mute-athan-"])
                     ],
@@ -221,7 +202,7 @@ class Athany:
                         sg.Text(
                             f"({self.settings['-location-']['-city-']}, {self.settings['-location-']['-country-']})", pad=0),
                         sg.Push(),
-                        sg.Button(image_data=TOGGLE_ON_B64 if self.save_loc_check else TOGGLE_OFF_B64,
+                        sg.Button(image_data=assets.get("toggle_on") if self.save_loc_check else assets.get("toggle_off"),
                                   key="-TOGGLE-SAVE-LOCATION-", button_color=(sg.theme_background_color(), sg.theme_background_color()),
                                   border_width=0, pad=(5, 0), metadata=self.save_loc_check)
                     ]]), expand_x=True),
@@ -245,32 +226,90 @@ class Athany:
                 TranslatedText(self.translator, "Current athan", pad=(5, 5),
                                key="-DISPLAYED-MSG-"),
                 sg.Push(),
-                sg.Combo(disabled=self.settings["-use-custom-athan-"], enable_events=True,
-                         values=AVAILABLE_ATHANS, key="-DROPDOWN-ATHANS-",
+                sg.Combo(disabled=self.settings["-use-custom-athan-"] or self.window.downloads.active,
+                         enable_events=True, values=self.athans.names(), key="-DROPDOWN-ATHANS-",
                          readonly=True, s=37, default_value=current_athan,
                          font="Helvetica 9", pad=(10, 5))
+            ],
+            [
+                sg.pin(sg.Col(self.translator.adjust_layout_direction([[
+                    sg.ProgressBar(max_value=100, size=(20, 10), expand_x=True,
+                                   orientation="h", key="-DOWNLOAD-PROGRESS-"),
+                    TranslatedButton(self.translator, "Cancel",
+                                     key="-CANCEL-DOWNLOAD-", font=self.BUTTON_FONT)
+                ]]), key="-DOWNLOAD-ROW-", visible=self.window.downloads.active, expand_x=True),
+                    expand_x=True),
+                TranslatedButton(self.translator, "Download all athans", key="-PREFETCH-ATHANS-",
+                                 font=self.BUTTON_FONT, disabled=self.window.downloads.active)
             ]
         ])
 
-        # tab 2 contains prayer offset adjustments
-        prayer_offset_tab = self.translator.adjust_layout_direction([
+        settings_layout = [
+            [
+                sg.TabGroup([[
+                            sg.Tab(self.translator.translate(
+                                "general settings"), app_settings_tab, key="-GENERAL-TAB-"),
+                            sg.Tab(self.translator.translate(
+                                "custom athan"), [[sg.Col([[]], key="-CUSTOM-ATHAN-TAB-BODY-", pad=0)]],
+                                key="-CUSTOM-ATHAN-TAB-"),
+                            sg.Tab(self.translator.translate(
+                                "prayer times offset (min)"), [[sg.Col([[]], key="-OFFSET-TAB-BODY-", pad=0)]],
+                                key="-OFFSET-TAB-"),
+                            sg.Tab(self.translator.translate(
+                                "advanced settings"), [[sg.Col([[]], key="-ADVANCED-TAB-BODY-", pad=0)]],
+                                key="-ADVANCED-TAB-"),
+                            sg.Tab(self.translator.translate(
+                                "other locations"), [[sg.Col([[]], key="-LOCATIONS-TAB-BODY-", pad=0)]],
+                                key="-LOCATIONS-TAB-")
+                            ]], key="-SETTINGS-TABS-", enable_events=True)
+            ],
+            [
+                TranslatedButton(self.translator, "Restart", key="-RESTART-",
+                                 font=self.BUTTON_FONT, s=self.settings_button_width, pad=(5, 15)),
+                TranslatedButton(self.translator, "Exit", key="-EXIT-",
+                                 font=self.BUTTON_FONT,
+                                 button_color=('black', '#651C32'),
+                                 s=self.settings_button_width, pad=(5, 15)),
+                sg.Push(),
+                TranslatedButton(self.translator, "Done", key="-DONE-",
+                                 font=self.BUTTON_FONT, s=self.settings_button_width, pad=(5, 15))
+            ]
+        ]
+
+        return SettingsWindow(self, tab_builders={"-CUSTOM-ATHAN-TAB-": self.generate_custom_athan_tab,
+                                                  "-OFFSET-TAB-": self.generate_offset_tab,
+                                                  "-ADVANCED-TAB-": self.generate_advanced_tab,
+                                                  "-LOCATIONS-TAB-": self.generate_locations_tab},
+                              title="Athany - settings",
+                              layout=settings_layout,
+                              icon=assets.get("settings_icon"),
+                              font=self.GUI_FONT,
+                              enable_close_attempted_event=True,
+                              keep_on_top=True)
+
+    def generate_offset_tab(self) -> list:
+        """method to generate the prayer offsets tab of the settings window
+
+        :return list[list]: tab layout
+        """
+        return self.translator.adjust_layout_direction([
             [
                 sg.Col(
                     self.translator.adjust_layout_direction([
                         [TranslatedText(self.translator, "Fajr offset"),
                          sg.Push(), sg.Spin(
                          [sz for sz in range(-59, 60)], initial_value=self.settings["-offset-"]["-Fajr-"],
-                         key="-FAJR-OFFSET-", readonly=True, text_color="black")
+                         key="-FAJR-OFFSET-", readonly=True, text_color="black", enable_events=True)
                          ],
                         [TranslatedText(self.translator, "Sunrise offset"),
                          sg.Push(), sg.Spin(
                          [sz for sz in range(-59, 60)], initial_value=self.settings["-offset-"]["-Sunrise-"],
-                         key="-SUNRISE-OFFSET-", readonly=True, text_color="black")
+                         key="-SUNRISE-OFFSET-", readonly=True, text_color="black", enable_events=True)
                          ],
                         [TranslatedText(self.translator, "Dhuhr offset"),
                          sg.Push(), sg.Spin(
                          [sz for sz in range(-59, 60)], initial_value=self.settings["-offset-"]["-Dhuhr-"],
-                         key="-DHUHR-OFFSET-", readonly=True, text_color="black")
+                         key="-DHUHR-OFFSET-", readonly=True, text_color="black", enable_events=True)
                          ]
                     ]), expand_x=True),
                 sg.Col(
@@ -278,17 +317,17 @@ class Athany:
                         [TranslatedText(self.translator, "Asr offset"),
                          sg.Push(), sg.Spin(
                          [sz for sz in range(-59, 60)], initial_value=self.settings["-offset-"]["-Asr-"],
-                         key="-ASR-OFFSET-", readonly=True, text_color="black")
+                         key="-ASR-OFFSET-", readonly=True, text_color="black", enable_events=True)
                          ],
                         [TranslatedText(self.translator, "Maghrib offset"),
                          sg.Push(), sg.Spin(
                          [sz for sz in range(-59, 60)], initial_value=self.settings["-offset-"]["-Maghrib-"],
-                         key="-MAGHRIB-OFFSET-", readonly=True, text_color="black")
+                         key="-MAGHRIB-OFFSET-", readonly=True, text_color="black", enable_events=True)
                          ],
                         [TranslatedText(self.translator, "Isha offset"),
                          sg.Push(), sg.Spin(
                          [sz for sz in range(-59, 60)], initial_value=self.settings["-offset-"]["-Isha-"],
-                         key="-ISHA-OFFSET-", readonly=True, text_color="black")
+                         key="-ISHA-OFFSET-", readonly=True, text_color="black", enable_events=True)
                          ]
                     ]
                     ), expand_x=True)
@@ -300,13 +339,17 @@ class Athany:
             ]
         ])
 
-        # tab 3 containing custom athan settings
-        custom_athan_tab = self.translator.adjust_layout_direction([
+    def generate_custom_athan_tab(self) -> list:
+        """method to generate the custom athan tab of the settings window
+
+        :return list[list]: tab layout
+        """
+        return self.translator.adjust_layout_direction([
             [
                 TranslatedText(self.translator,
                                "Use custom athan sound", pad=5),
                 sg.Push(),
-                sg.Button(image_data=TOGGLE_ON_B64 if self.settings["-use-custom-athan-"] else TOGGLE_OFF_B64,
+                sg.Button(image_data=assets.get("toggle_on") if self.settings["-use-custom-athan-"] else assets.get("toggle_off"),
                           key="-TOGGLE-CUSTOM-ATHAN-", pad=(5, 0), button_color=(sg.theme_background_color(), sg.theme_background_color()),
                           border_width=0, metadata=self.settings["-use-custom-athan-"])
             ],
@@ -326,8 +369,15 @@ class Athany:
 
         ])
 
-        # tab 4 is for advanced calculation settings
-        advanced_settings_tab = self.translator.adjust_layout_direction([
+    def generate_advanced_tab(self) -> list:
+        """method to generate the advanced calculation settings tab of the settings window
+
+        :return list[list]: tab layout
+        """
+        method = self.pt.calculation_methods.get(
+            self.settings["-used-method-"], self.pt.calculation_methods[4])[1]
+
+        return self.translator.adjust_layout_direction([
             [
                 TranslatedText(self.translator,
                                "Calculation method", pad=(5, 10)),
@@ -359,38 +409,31 @@ class Athany:
             ]
         ])
 
-        settings_layout = [
+    def generate_locations_tab(self) -> list:
+        """method to generate the tab of the settings window that manages the other monitored locations
+
+        :return list[list]: tab layout
+        """
+        return self.translator.adjust_layout_direction([
             [
-                sg.TabGroup([[
-                            sg.Tab(self.translator.translate(
-                                "general settings"), app_settings_tab),
-                            sg.Tab(self.translator.translate(
-                                "custom athan"), custom_athan_tab),
-                            sg.Tab(self.translator.translate(
-                                "prayer times offset (min)"), prayer_offset_tab),
-                            sg.Tab(self.translator.translate(
-                                "advanced settings"), advanced_settings_tab)
-                            ]])
+                sg.Listbox([location.name for location in self.locations], key="-LOCATIONS-LIST-",
+                           size=(30, 4), expand_x=True, font=(self.GUI_FONT[0], 10))
             ],
             [
-                TranslatedButton(self.translator, "Restart", key="-RESTART-",
-                                 font=self.BUTTON_FONT, s=self.settings_button_width, pad=(5, 15)),
-                TranslatedButton(self.translator, "Exit", key="-EXIT-",
-                                 font=self.BUTTON_FONT,
-                                 button_color=('black', '#651C32'),
-                                 s=self.settings_button_width, pad=(5, 15)),
+                TranslatedText(self.translator, "City"),
+                sg.Input(size=(12, 1), key="-NEW-LOCATION-CITY-"),
+                TranslatedText(self.translator, "Country"),
+                sg.Input(size=(12, 1), key="-NEW-LOCATION-COUNTRY-"),
                 sg.Push(),
-                TranslatedButton(self.translator, "Done", key="-DONE-",
-                                 font=self.BUTTON_FONT, s=self.settings_button_width, pad=(5, 15))
+                TranslatedButton(self.translator, "Add", key="-ADD-LOCATION-",
+                                 font=self.BUTTON_FONT),
+                TranslatedButton(self.translator, "Remove", key="-REMOVE-LOCATION-",
+                                 font=self.BUTTON_FONT)
+            ],
+            [
+                TranslatedText(self.translator, key="-LOCATIONS-MSG-", expand_x=True)
             ]
-        ]
-
-        return SettingsWindow(self, title="Athany - settings",
-                              layout=settings_layout,
-                              icon=SETTINGS_ICON,
-                              font=self.GUI_FONT,
-                              enable_close_attempted_event=True,
-                              keep_on_top=True)
+        ])
 
     def yes_or_no_popup(self, text="Do you want to restart the application?"):
         """function to display a popup window & prompt the user to try again"""
@@ -406,75 +449,36 @@ class Athany:
 
     # ------------------------ athan-related methods ------------------------ #
 
-    def download_athan(self, athan_filename: str) -> bool:
-        """Function to download athans from app bucket
-        :param athan_filename: (str) name of .wav file to download from bucket
-        :return: (bool) True if the download completed successfully without errors, False otherwise
+    def current_athan_path(self) -> str:
         """
-        try:
-            prog_win = None
-            saved_file = os.path.join(ATHANS_DIR, athan_filename)
-            with open(saved_file, "wb") as athan_file:
-                file_data = requests.get("https://github.com/0xzer0x/athany/raw/master/src/Data/Athans/"+athan_filename,
-                                         stream=True, timeout=10)
-                file_size = int(file_data.headers.get("content-length"))
-
-                progress_layout = self.translator.adjust_layout_direction([
-                    [TranslatedText(self.translator, "Downloading", pad=0),
-                        sg.Text(f"{athan_filename} ({file_size//1024} KB)", pad=0)],
-                    [sg.ProgressBar(max_value=file_size,
-                                    size=(20, 10), expand_x=True, orientation="h", key="-PROGRESS-METER-")],
-                    [sg.Push(),
-                     TranslatedButton(self.translator, "Cancel", key="-CANCEL-")]
-                ])
-
-                prog_win = sg.Window("Download athan", progress_layout,
-                                     font=self.BUTTON_FONT, icon=DOWNLOAD_ICON_B64,
-                                     keep_on_top=True, enable_close_attempted_event=True)
-
-                dl = 0
-                for chunk in file_data.iter_content(chunk_size=4096):
-                    dl += len(chunk)
-                    athan_file.write(chunk)
-
-                    prog_e = prog_win.read(timeout=10)[0]
-                    prog_win.make_modal()
-                    if prog_e in (sg.WIN_CLOSE_ATTEMPTED_EVENT, "-CANCEL-"):
-                        file_data.close()
-                        raise requests.exceptions.ConnectionError
-
-                    prog_win["-PROGRESS-METER-"].update(current_count=dl)
-
-                prog_win.close()
-                del prog_win
-
-            return True
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.InvalidURL):
-            if prog_win:
-                prog_win.close()
-                del prog_win
+        :return str: path of the athan chosen in the settings (built-in or custom)
+        """
+        if self.settings["-use-custom-athan-"]:
+            return self.settings["-custom-athan-"]
 
-            os.remove(saved_file)
-            return False
+        return self.athans.path(self.settings["-athan-sound-"])
 
     def play_current_athan(self):
         """ fetches current settings for athan and plays the corresponding athan
         :return: (bool) boolean value to represent whether an audio is playing or not
         """
-        mixer.music.unload()
-
-        if self.settings["-use-custom-athan-"]:
-            current_athan_path = self.settings["-custom-athan-"]
-        else:
-            current_athan_path = os.path.join(
-                ATHANS_DIR, self.settings["-athan-sound-"])
-
-        mixer.music.load(current_athan_path, current_athan_path[-3:])
-        mixer.music.play()
+        audio.play(self.current_athan_path())
         return True
 
+    def prearm_current_athan(self):
+        """decodes the current athan in the background ahead of the upcoming prayer
+        so that it starts playing as soon as the prayer time comes"""
+        if not self.settings["-mute-athan-"] and self.pt.upcoming_fard[0] != "Sunrise":
+            audio.prearm(self.current_athan_path())
+
     # --------------------------- helper methods ---------------------------- #
 
+    def get_hijri_date(self) -> str:
+        """function to return arabic hijri date string to display in main window
+        :return: (str) Arabic string of the current Hijri date in the location timezone
+        """
+        return self.hijri.formatted(self.pt.now.date())
+
     def fetch_calculation_data(self, cit: str, count: str) -> dict:
         """check if location data (coords, timezone) for city+country exists and fetch it if not
         :param cit: (str) city to get data for
@@ -485,17 +489,25 @@ class Athany:
             DATA_DIR, f"{cit}-{count}.json")
 
         if not os.path.exists(json_month_file):
-            try:
-                res = requests.get(
-                    self.api_endpoint+f"?city={cit}&country={count}", timeout=5)
-            except (requests.Timeout, requests.ConnectionError):
-                return "RequestError"
-
-            if res.status_code != 200:  # if invalid city or country, return None instead of filename
-                return None
+            # the bundled city index resolves most cities without a network round trip
+            metadata = geocoding.lookup(cit, count)
+            if metadata is None:
+                import requests
+                try:
+                    res = network.get(
+                        self.api_endpoint, params={"city": cit, "country": count})
+                except (requests.Timeout, requests.ConnectionError):
+                    return "RequestError"
+
+                if res.status_code != 200:  # if invalid city or country, return None instead of filename
+                    return None
+
+                metadata = res.json()["data"]["meta"]
+            else:
+                print(f"[DEBUG] Resolved {cit}, {count} from the offline city index")
 
             with open(json_month_file, mode="w", encoding="utf-8") as f:
-                json.dump(res.json()["data"]["meta"], f)
+                json.dump(metadata, f)
 
         with open(json_month_file, encoding="utf-8") as location_metadata:
             data = json.load(location_metadata)
@@ -506,14 +518,23 @@ class Athany:
         """sets the prayer times window layout and
         the inital upcoming prayers on application startup
         """
-        self.pt = ModifiedPrayerTimes(self)
+        self.pt = ModifiedPrayerTimes(self, state_file=StateFile())
+        self.hijri = HijriDateService(self.settings["-location-"]["-timezone-"])
         # Prayer times change after Isha athan to the times of the following day
         # this sets the current_fard & upcoming_prayer times
         self.pt.update_current_and_next_prayer()
+        self.load_locations()
 
         print(" DEBUG ".center(50, "="))
+        self.init_layout = self.generate_main_layout()
+        print("="*50)
+
+    def generate_main_layout(self) -> list:
+        """method to generate the main window layout based on the app language & current prayer times
 
-        self.init_layout = [
+        :return list[list]: main window layout
+        """
+        layout = [
             [
                 sg.Text(key="-TODAY-",
                         font=(self.GUI_FONT[0], self.GUI_FONT[1], "bold")),
@@ -534,22 +555,26 @@ class Athany:
             ]
         ]
 
-        for prayer, time in self.pt.current_furood.items():
+        for prayer, prayer_time in self.pt.current_furood.items():
             # setting the main window layout with the inital prayer times
-            self.init_layout.append(
+            layout.append(
                 [
                     TranslatedText(self.translator, prayer,
                                    key=f"-{prayer.upper()}-", font=self.GUI_FONT),
                     sg.Push(),
-                    sg.Text(time.strftime('%I:%M %p'), key=f"-{prayer.upper()}-TIME-",
+                    sg.Text(prayer_time.strftime('%I:%M %p'), key=f"-{prayer.upper()}-TIME-",
                             font=self.GUI_FONT)
                 ]
             )
 
             print(prayer, time)  # Debugging
 
+        # the next prayer of every other monitored location, one line each
+        layout.append([sg.pin(sg.Text(key="-LOCATIONS-", font=(self.GUI_FONT[0], 9),
+                                      visible=len(self.locations) > 0))])
+
         # the rest of the main window layout
-        self.init_layout += [
+        layout += [
             [sg.HorizontalSeparator(color="black")],
             [
                 TranslatedButton(self.translator, "Settings", key="-SETTINGS-",
@@ -564,10 +589,48 @@ class Athany:
             ]
         ]
 
-        self.init_layout = self.init_layout[:1] + \
-            self.translator.adjust_layout_direction(self.init_layout[1:])
+        return layout[:1] + self.translator.adjust_layout_direction(layout[1:])
 
-        print("="*50)
+    def load_locations(self):
+        """method to start monitoring the other locations saved in the settings"""
+        if self.locations is not None:
+            self.locations.close()
+        self.locations = LocationMonitor()
+        now = time.time()
+        for entry in self.settings["-locations-"]:
+            self.locations.add(monitored_location(entry, self.pt.method_parameters(entry["-method-"]),
+                                                  self.settings["-calculation-backend-"]), now)
+
+    def add_location(self, city: str, country: str):
+        """method to fetch the location data of the given city & start monitoring its prayer times
+
+        :param str city: city of the location
+        :param str country: country of the location
+        :return str: message to display if the location couldn't be added, None if it was added
+        """
+        location_data = self.fetch_calculation_data(city, country)
+        if location_data is None:
+            return "Invalid city or country, enter a valid location"
+        if location_data == "RequestError":
+            return "Internet connection required"
+
+        entry = {"-city-": city, "-country-": country,
+                 "-coordinates-": (location_data["latitude"], location_data["longitude"]),
+                 "-timezone-": location_data["timezone"],
+                 "-method-": location_data["method"]["id"]}
+        self.locations.add(monitored_location(entry, self.pt.method_parameters(entry["-method-"]),
+                                              self.settings["-calculation-backend-"]), time.time())
+        self.settings["-locations-"] = self.settings["-locations-"] + [entry]
+        return None
+
+    def remove_location(self, index: int):
+        """method to stop monitoring the other location at the given index
+
+        :param int index: index of the location in the saved locations
+        """
+        self.locations.remove(index)
+        self.settings["-locations-"] = [entry for position, entry in enumerate(self.settings["-locations-"])
+                                        if position != index]
 
     def choose_location_if_not_saved(self) -> dict:
         """function to get & set the user location
@@ -589,14 +652,37 @@ class Athany:
     # ---------------------- startup & shutdown methods ---------------------- #
 
     def display_main_window(self, init_main_layout):
-        """Displays the main application window, keeps running until window is closed
+        """Displays the main application window, keeps running until window is closed,
+        the window is rebuilt in place when the theme or language is changed in the settings
         :param init_main_layout: (list) main application window layout
         """
-        mixer.init(frequency=16000)
-        self.window = MainWindow(self,
+        self.create_main_window(init_main_layout)
+        while True:
+            self.window.run_event_loop()
+            if not self.window.reload_requested:
+                break
+
+            # hot reload: only the windows are rebuilt, the settings are reopened in the new look
+            previous = self.window
+            self.apply_appearance()
+            self.create_main_window(self.generate_main_layout(), previous)
+            previous.close()
+
+        # when the event loop ends, close the application
+        self.close_app_windows()
+
+    def create_main_window(self, init_main_layout, previous=None):
+        """method to create the main window, taking over the system tray & downloads of
+        the previous main window (if any) so that they keep running while the window is rebuilt
+
+        :param list[list] init_main_layout: main application window layout
+        :param MainWindow previous: the main window being replaced
+        """
+        self.window = MainWindow(self, previous=previous,
                                  title="Athany: a python athan app",
                                  layout=init_main_layout,
                                  enable_close_attempted_event=True,
+                                 location=previous.current_location() if previous is not None else (None, None),
                                  finalize=True)
 
         if self.translator.bidirectional:
@@ -610,12 +696,18 @@ class Athany:
             self.window["-RIGHT-DECORATION-"].update(
                 value=sg.SYMBOL_RIGHT_ARROWHEAD)
 
-        self.window.start_system_tray()
         self.window.highlight_current_fard_in_ui()
-        self.window.run_event_loop()
-
-        # when the event loop ends, close the application
-        self.close_app_windows()
+        if previous is None:
+            self.window.start_system_tray()
+            # called on the audio receiver thread, so it's passed on as a thread-safe window event
+            audio.set_error_handler(lambda path, error: self.window.write_event_value(
+                audio.ERROR_EVENT, (path, error)))
+            self.window.query_server.start()
+        else:
+            if previous.hidden:
+                self.window.hide()
+                self.window.hidden = True
+            self.window.write_event_value("-SETTINGS-", None)
 
     def close_app_windows(self):
         """function to properly close all app windows before shutting down"""
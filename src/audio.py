@@ -0,0 +1,534 @@
+"""
+module for playing athan audio in a separate audio player process,
+the GUI process only sends commands over a pipe & never imports pygame,
+so a slow decode or a crash in the audio stack can't freeze the event loop
+"""
+import io
+import os
+import wave
+import queue
+import atexit
+import threading
+import multiprocessing
+from collections import OrderedDict
+
+from src import pack
+from src.catalog import get_catalog, mp3_format, probe_mp3
+
+# number of decoded athans kept in memory, they're decoded in their native format
+# (about 10 MB per minute of 44.1 kHz stereo audio, 11 MB at 48 kHz)
+CACHE_SIZE = 2
+# largest decoded (16-bit PCM) size of a preloaded file, enough for the longest bundled athan at
+# 48 kHz stereo, longer files (e.g. a long custom athan) are streamed instead of decoded into memory
+MAX_PRELOAD_BYTES = 48 * 1024 * 1024
+# the player process is stopped after this many seconds without commands or playback to free
+# its memory, the next command (e.g. the pre-arm before the next prayer) starts it again
+IDLE_TIMEOUT = 300
+STATUS_TIMEOUT = 0.5
+# output format of files that can't be probed (sample rate, channels)
+DEFAULT_FORMAT = (16000, 2)
+# window event written with a (path, error message) value when the player couldn't play a file
+ERROR_EVENT = "-AUDIO-ERROR-"
+
+# ------------------------- player process side ------------------------- #
+
+_mixer = None
+_format = None  # (sample rate, channels) the output device is opened with
+_channel = None
+_stream = None  # in-memory recording streamed by mixer.music, which reads it while playing
+_volume = 1.0
+_cache = OrderedDict()  # path -> ((mtime, size), pygame.mixer.Sound)
+_lock = threading.RLock()
+
+
+def probe(path: str) -> tuple:
+    """function to get the native format of an audio file from its header
+
+    :param str path: path of the .mp3/.wav file or packed athan
+    :return tuple[int, int]: sample rate & number of channels, DEFAULT_FORMAT if it can't be probed
+    """
+    entry = _pack_entry(path)
+    if entry is not None:
+        return entry.rate, entry.channels
+
+    try:
+        if path.lower().endswith(".wav"):
+            with wave.open(path, "rb") as wav_file:
+                return wav_file.getframerate(), wav_file.getnchannels()
+        if path.lower().endswith(".mp3"):
+            return mp3_format(path)
+    except (OSError, EOFError, ValueError, wave.Error):
+        pass
+
+    return DEFAULT_FORMAT
+
+
+def get_mixer(audio_format: tuple = None):
+    """function to import & initialize the pygame mixer on first use (player process only),
+    the output device is reopened in the given format so that audio isn't resampled while
+    playing, reopening invalidates the decoded sounds as they're stored in the device format
+
+    :param tuple[int, int] audio_format: (sample rate, channels) to open the output device with,
+    the current format (or DEFAULT_FORMAT) if not given
+    :return module: initialized pygame.mixer module
+    """
+    global _mixer, _format
+    with _lock:
+        if _mixer is None:
+            os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+            # SDL turns SIGTERM into a quit event by default, which would keep the player alive
+            os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+            from pygame import mixer
+            _mixer = mixer
+
+        audio_format = audio_format or _format or DEFAULT_FORMAT
+        if audio_format != _format:
+            if _format is not None:
+                _stop()
+                _mixer.quit()
+                _cache.clear()
+            _mixer.init(frequency=audio_format[0], channels=audio_format[1])
+            _format = audio_format
+            print(f"[DEBUG] Audio output opened at {audio_format[0]} Hz, {audio_format[1]} channel(s)")
+
+    return _mixer
+
+
+def _pack_entry(path: str):
+    """
+    :param str path: path of an audio file or packed athan
+    :return pack.PackEntry: the pack entry of a packed athan, None for other files
+    """
+    filename = pack.parse_ref(path)
+    if filename is None:
+        return None
+
+    athans_pack = pack.get_pack()
+    entry = athans_pack.get(filename) if athans_pack is not None else None
+    if entry is None:
+        raise FileNotFoundError(f"{filename} isn't in the athans pack")
+    return entry
+
+
+def source(path: str):
+    """
+    :param str path: path of an audio file or packed athan
+    :return tuple[str | io.BytesIO, str]: file (or in-memory recording) to load & its type hint
+    """
+    entry = _pack_entry(path)
+    if entry is None:
+        return path, path[-3:]
+
+    return io.BytesIO(pack.get_pack().data(entry)), entry.codec
+
+
+def _is_playing() -> bool:
+    return _mixer is not None and _format is not None and (
+        _mixer.music.get_busy() or (_channel is not None and _channel.get_busy()))
+
+
+def _stamp(path: str):
+    """
+    :param str path: path of an audio file or packed athan
+    :return tuple: modification time & size of the file (or pack), which invalidate its cached sound
+    """
+    entry = _pack_entry(path)
+    if entry is not None:
+        return pack.get_pack().stamp + (entry.offset, entry.frames)
+
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _duration(path: str) -> float:
+    """
+    :param str path: path of an audio file or packed athan
+    :return float: duration of the audio in seconds or None if it's unknown
+    """
+    entry = _pack_entry(path)
+    if entry is not None and entry.frames:
+        return entry.frames / entry.rate
+
+    athan = get_catalog().by_filename(pack.parse_ref(path) or os.path.basename(path))
+    if athan is not None:
+        return athan.duration
+
+    try:  # a custom athan
+        if path.lower().endswith(".wav"):
+            with wave.open(path, "rb") as wav_file:
+                return wav_file.getnframes() / wav_file.getframerate()
+        if path.lower().endswith(".mp3"):
+            return probe_mp3(path)[0]
+    except (OSError, EOFError, ValueError, wave.Error):
+        pass
+    return None
+
+
+def decoded_size(path: str) -> int:
+    """
+    :param str path: path of an audio file or packed athan
+    :return int: size in bytes of the 16-bit PCM the file decodes to in its native format,
+    the size of the file if its duration is unknown
+    """
+    duration = _duration(path)
+    if duration is None:
+        return os.path.getsize(path)
+
+    sample_rate, channels = probe(path)
+    return int(duration * sample_rate * channels * 2)
+
+
+def cached(path: str):
+    """
+    :param str path: path of an audio file or packed athan
+    :return pygame.mixer.Sound: the decoded sound of the file if it's cached & the file didn't change
+    """
+    try:
+        stamp = _stamp(path)
+    except OSError:
+        return None
+
+    with _lock:
+        entry = _cache.get(path)
+        if entry is None or entry[0] != stamp:
+            return None
+        _cache.move_to_end(path)
+        return entry[1]
+
+
+def preload(path: str):
+    """function to decode the given audio file into an in-memory PCM buffer, the decoded sound
+    is cached until the file is modified or evicted by more recently used files,
+    a packed takbeer-only athan is cut from the decoded full recording
+
+    :param str path: path of the .mp3/.wav file or packed athan to decode
+    :return pygame.mixer.Sound: the decoded sound or None if the file should be streamed
+    """
+    sound = cached(path)
+    if sound is not None:
+        return sound
+
+    stamp = _stamp(path)
+    entry = _pack_entry(path)
+    if decoded_size(path) > MAX_PRELOAD_BYTES:
+        return None
+
+    # decoded while holding the lock so the device isn't reopened in another format meanwhile
+    with _lock:
+        audio_format = probe(path)
+        if audio_format != _format and _is_playing():
+            return None  # reopening the device would cut the playing audio, stream it instead
+
+        mixer = get_mixer(audio_format)
+        if entry is not None and entry.frames:
+            sound = _cut(path, entry, mixer)
+        else:
+            sound = mixer.Sound(file=source(path)[0])
+        _cache[path] = (stamp, sound)
+        _cache.move_to_end(path)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return sound
+
+
+def _cut(path: str, entry: pack.PackEntry, mixer):
+    """cut a packed takbeer-only athan from the decoded PCM of its full recording,
+    which is decoded once & cached for both athans (the lock must be held)"""
+    full = pack.get_pack().full_recording(entry)
+    sound = preload(pack.ref(full)) if full is not None else None
+    if sound is None:
+        sound = mixer.Sound(file=source(path)[0])
+
+    # the cut point is in frames of the recording, the device may have been opened at another rate
+    frequency, sample_format, channels = mixer.get_init()
+    frames = round(entry.frames * frequency / entry.rate)
+    return mixer.Sound(buffer=sound.get_raw()[:frames * channels * abs(sample_format) // 8])
+
+
+def _preload_in_background(path: str):
+    """decode the given audio file on a thread so the player keeps handling commands"""
+    def target():
+        try:
+            if preload(path) is not None:
+                print(f"[DEBUG] Pre-armed athan: {os.path.basename(path)}")
+        except (OSError, RuntimeError) as error:  # pygame.error is a RuntimeError
+            print(f"[DEBUG] Couldn't pre-arm athan: {error}")
+
+    threading.Thread(target=target, name="athan-prearm", daemon=True).start()
+
+
+def _play(path: str):
+    """play the decoded PCM buffer if the file was pre-armed, otherwise stream the file
+    (which starts faster than decoding it first) & pre-arm it for the next time,
+    packed takbeer-only athans can't be streamed as they end at a cut point"""
+    global _channel, _stream
+    with _lock:
+        _stop()
+        mixer = get_mixer(probe(path))
+
+        sound = cached(path)
+        entry = _pack_entry(path)
+        if sound is None and entry is not None and entry.frames:
+            sound = preload(path)
+
+        if sound is not None:
+            _channel = sound.play()
+            if _channel is not None:
+                _channel.set_volume(_volume)
+        else:
+            _stream, codec = source(path)
+            mixer.music.load(_stream, codec)
+            mixer.music.set_volume(_volume)
+            mixer.music.play()
+            _preload_in_background(path)
+
+
+def _stop():
+    global _channel, _stream
+    if _format is not None:
+        if _channel is not None:
+            _channel.stop()
+            _channel = None
+        _mixer.music.unload()
+        _stream = None
+
+
+def _set_volume(volume: float):
+    global _volume
+    _volume = min(max(volume, 0.0), 1.0)
+    if _channel is not None:
+        _channel.set_volume(_volume)
+    if _format is not None:
+        _mixer.music.set_volume(_volume)
+
+
+def _status() -> dict:
+    with _lock:
+        cached_files = [pack.parse_ref(path) or os.path.basename(path) for path in _cache]
+
+    return {"pid": os.getpid(), "playing": _is_playing(), "format": _format,
+            "volume": _volume, "cached": cached_files}
+
+
+def serve(conn):
+    """entry point of the player process, handles the commands sent over the pipe
+    until it receives "quit" or the GUI process exits
+
+    :param multiprocessing.connection.Connection conn: player end of the pipe,
+    status answers are sent back as (request, status) & failed plays as ("error", path, message)
+    """
+    commands = {"play": _play, "stop": _stop, "preload": _preload_in_background,
+                "volume": _set_volume}
+    while True:
+        try:
+            command, *args = conn.recv()
+        except (EOFError, OSError):  # the GUI process exited
+            break
+
+        if command == "quit":
+            break
+        try:
+            if command == "status":
+                conn.send((args[0], _status()))
+            else:
+                commands[command](*args)
+        except (OSError, RuntimeError) as error:  # pygame.error is a RuntimeError
+            print(f"[DEBUG] Audio player couldn't {command}: {error}")
+            if command == "play":
+                try:
+                    conn.send(("error", args[0], str(error)))
+                except OSError:
+                    break
+
+
+# --------------------------- GUI process side --------------------------- #
+
+class AudioPlayer:
+    """class that controls the audio player process, the process is started on the first command,
+    restarted if it crashed & stopped after idle_timeout seconds without commands or playback,
+    the messages of the player are read on a receiver thread that calls on_error(path, message)
+    for the files it couldn't play"""
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT, on_error=None):
+        self.idle_timeout = idle_timeout
+        self.on_error = on_error
+        self._process = None
+        self._conn = None
+        self._replies = queue.Queue()  # (request, status) answers of the player
+        self._request = 0
+        self._idle_timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """
+        :return bool: whether the player process is running
+        """
+        return self._process is not None and self._process.is_alive()
+
+    def _start(self):
+        if self._process is not None:
+            print(f"[DEBUG] Audio player exited ({self._process.exitcode}), restarting it")
+            self._conn.close()
+
+        # spawned so the player doesn't inherit the memory & Tk state of the GUI process
+        context = multiprocessing.get_context("spawn")
+        self._conn, player_conn = context.Pipe()
+        self._process = context.Process(target=serve, args=(player_conn,),
+                                        name="athany-audio", daemon=True)
+        self._process.start()
+        player_conn.close()
+        threading.Thread(target=self._receive, args=(self._conn,),
+                         name="athany-audio-receiver", daemon=True).start()
+
+    def _receive(self, conn):
+        # runs until the pipe of this player process is closed
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            if message[0] == "error":
+                if self.on_error is not None:
+                    self.on_error(*message[1:])
+            else:
+                self._replies.put(message)
+
+    def _send(self, message: tuple) -> bool:
+        # the lock must be held, the player is started (again) if it's not running
+        for _ in range(2):
+            if not self.running:
+                self._start()
+            try:
+                self._conn.send(message)
+                return True
+            except OSError:  # the player died after the liveness check
+                self._process.join(timeout=0)
+
+        return False
+
+    def send(self, *message) -> bool:
+        """method to send a command to the player process without waiting for it
+
+        :return bool: whether the command was delivered
+        """
+        with self._lock:
+            delivered = self._send(message)
+        self._schedule_idle_check()
+        return delivered
+
+    def status(self, timeout: float = STATUS_TIMEOUT):
+        """
+        :param float timeout: seconds to wait for the player to answer
+        :return dict: player status (pid, playing, format, volume, cached files) or None if it didn't answer
+        """
+        with self._lock:
+            if not self.running:
+                return None
+
+            self._request += 1
+            if not self._send(("status", self._request)):
+                return None
+            try:
+                while True:
+                    request, status = self._replies.get(timeout=timeout)
+                    if request == self._request:  # skip answers to timed out requests
+                        return status
+            except queue.Empty:
+                pass
+
+        return None
+
+    def _schedule_idle_check(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.idle_timeout, self._stop_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _stop_if_idle(self):
+        status = self.status()
+        if status is not None and status["playing"]:
+            self._schedule_idle_check()
+        else:
+            self.close()
+
+    def close(self):
+        """method to stop the player process, the next command starts a new one"""
+        with self._lock:
+            if self.running:
+                try:
+                    self._conn.send(("quit",))
+                except OSError:
+                    pass
+                self._process.join(timeout=1)
+                if self._process.is_alive():  # stuck in the audio stack
+                    self._process.kill()
+                    self._process.join(timeout=1)
+            if self._conn is not None:
+                self._conn.close()
+            self._process, self._conn = None, None
+
+
+_player = None
+
+
+def get_player() -> AudioPlayer:
+    """
+    :return AudioPlayer: the audio player of the application, created on first use
+    """
+    global _player
+    if _player is None:
+        _player = AudioPlayer()
+        atexit.register(_player.close)
+
+    return _player
+
+
+def set_error_handler(handler):
+    """function to set the function called (on a background thread) when a file couldn't be played
+
+    :param callable handler: function taking the path of the file & the error message
+    """
+    get_player().on_error = handler
+
+
+def play(path: str):
+    """function to play the given audio file, stopping any currently playing audio,
+    failures are reported asynchronously to the handler set by set_error_handler
+
+    :param str path: path of the .mp3/.wav file or packed athan to play
+    """
+    get_player().send("play", path)
+
+
+def prearm(path: str):
+    """function to decode the given audio file in the player process so that
+    playing it later starts without any decoding latency
+
+    :param str path: path of the .mp3/.wav file or packed athan to decode
+    """
+    get_player().send("preload", path)
+
+
+def stop():
+    """function to stop the currently playing audio (if any)"""
+    if _player is not None and _player.running:
+        _player.send("stop")
+
+
+def set_volume(volume: float):
+    """function to set the athan volume
+
+    :param float volume: volume between 0.0 & 1.0
+    """
+    get_player().send("volume", volume)
+
+
+def status():
+    """
+    :return dict: audio player status or None if the player isn't running
+    """
+    return _player.status() if _player is not None else None
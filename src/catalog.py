@@ -0,0 +1,255 @@
+"""
+module for the athans catalog, the indexed list of athans offered in the settings window
+"""
+import os
+import json
+import functools
+
+from src import pack
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+ATHANS_DIR = os.path.join(DATA_DIR, "Athans")
+# source recordings of the athans pack, only present in a git checkout
+# (packaged builds ship the pack built from them instead)
+SOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "assets", "athans")
+MANIFEST_FILE = os.path.join(DATA_DIR, "athans_manifest.json")
+MANIFEST_VERSION = 2
+
+# MPEG audio layer III tables indexed by the frame header fields
+MP3_BITRATES = {1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+                2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)}
+MP3_SAMPLE_RATES = {1: (44100, 48000, 32000),
+                    2: (22050, 24000, 16000),
+                    2.5: (11025, 12000, 8000)}
+MP3_VERSIONS = {0: 2.5, 2: 2, 3: 1}
+
+
+def _mp3_frame(header: int):
+    """
+    :param int header: 4 bytes at a possible frame start as a big-endian integer
+    :return tuple[int, int, int, int]: sample rate, samples, length in bytes & channels
+    of the frame or None if it's not an MPEG layer III frame header
+    """
+    version = MP3_VERSIONS.get((header >> 19) & 0b11)
+    bitrate_index = (header >> 12) & 0b1111
+    rate_index = (header >> 10) & 0b11
+    if (header >> 21) != 0x7FF or version is None or (header >> 17) & 0b11 != 0b01 \
+            or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    sample_rate = MP3_SAMPLE_RATES[version][rate_index]
+    bitrate = MP3_BITRATES[1 if version == 1 else 2][bitrate_index] * 1000
+    samples = 1152 if version == 1 else 576
+    padding = (header >> 9) & 1
+    channels = 1 if (header >> 6) & 0b11 == 0b11 else 2
+    return sample_rate, samples, samples // 8 * bitrate // sample_rate + padding, channels
+
+
+def _mp3_frames(data: bytes):
+    """generator of the (sample rate, samples, length, channels) of the frames in MP3 data"""
+    position = 0
+    if data[:3] == b"ID3":  # skip the ID3v2 tag, its size is a 28-bit syncsafe integer
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        position = 10 + size + (10 if data[5] & 0x10 else 0)
+
+    while position + 4 <= len(data):
+        frame = _mp3_frame(int.from_bytes(data[position:position + 4], "big"))
+        if frame is None:
+            if data[position:position + 3] == b"TAG":  # ID3v1 tag at the end of the file
+                break
+            position += 1  # not a layer III frame header, resynchronize
+            continue
+
+        yield frame
+        position += frame[2]
+
+
+def probe_mp3(filename: str) -> tuple:
+    """function to get the audio properties of an MP3 file by walking its frame headers,
+    the duration is exact for both constant & variable bitrate files
+
+    :param str filename: path of the MP3 file
+    :return tuple[float, int, int]: duration in seconds, sample rate & number of channels
+    :raises ValueError: if the file has no MPEG layer III frames
+    """
+    with open(filename, "rb") as mp3_file:
+        data = mp3_file.read()
+
+    samples, sample_rate, channels = 0, 0, 0
+    for sample_rate, frame_samples, _, channels in _mp3_frames(data):
+        samples += frame_samples
+
+    if not sample_rate:
+        raise ValueError(f"no MP3 frames found in {filename}")
+
+    return samples / sample_rate, sample_rate, channels
+
+
+def mp3_format(filename: str) -> tuple:
+    """function to get the output format of an MP3 file from its first frame,
+    much faster than probe_mp3 as the rest of the file isn't read
+
+    :param str filename: path of the MP3 file
+    :return tuple[int, int]: sample rate & number of channels
+    :raises ValueError: if no MPEG layer III frame is found at the start of the file
+    """
+    with open(filename, "rb") as mp3_file:
+        data = mp3_file.read(10)
+        if data[:3] == b"ID3":  # read past the ID3v2 tag (e.g. embedded cover art)
+            data += mp3_file.read((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9])
+        data += mp3_file.read(64 * 1024)
+
+    for sample_rate, _, _, channels in _mp3_frames(data):
+        return sample_rate, channels
+
+    raise ValueError(f"no MP3 frames found in {filename}")
+
+
+class Athan:
+    """class that holds the catalog entry of one athan"""
+
+    def __init__(self, name: str, filename: str, size: int, sha256: str,
+                 duration: float, takbeer: bool, available: bool = False):
+        self.name = name
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+        self.duration = duration
+        self.takbeer = takbeer
+        self.available = available
+
+    def __repr__(self):
+        return f"Athan({self.name!r}, available={self.available})"
+
+
+class AthanCatalog:
+    """class that indexes the athans manifest by display name & filename, the bundled athans are
+    played from the athans pack (or their source recordings in a git checkout without a built pack)
+    & the others from the downloads directory, the directories are scanned once on load & the
+    download manager keeps the availability of each athan current afterwards"""
+
+    def __init__(self, manifest_file: str = MANIFEST_FILE, directory: str = ATHANS_DIR,
+                 athans_pack=None, sources_dir: str = SOURCES_DIR):
+        self.directory = directory
+        self.sources_dir = sources_dir
+        self.pack = pack.get_pack() if athans_pack is None else athans_pack
+        with open(manifest_file, encoding="utf-8") as manifest:
+            data = json.load(manifest)
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"unsupported athans manifest: {manifest_file}")
+
+        try:
+            self._on_disk = {entry.name for entry in os.scandir(directory)
+                             if entry.is_file()}
+        except OSError:
+            self._on_disk = set()
+
+        self._sources = set()
+        if self.pack is None:
+            try:
+                self._sources = {entry.name for entry in os.scandir(self.sources_dir)
+                                 if entry.is_file()}
+            except OSError:
+                pass
+
+        self.athans = [Athan(**entry, available=entry["filename"] in self._on_disk
+                             or self.is_packed(entry["filename"]))
+                       for entry in data["athans"]]
+        self._by_name = {athan.name: athan for athan in self.athans}
+        self._by_filename = {athan.filename: athan for athan in self.athans}
+        self._names = [athan.name for athan in self.athans]
+
+    def __len__(self):
+        return len(self.athans)
+
+    def __iter__(self):
+        return iter(self.athans)
+
+    def names(self) -> list:
+        """
+        :return list[str]: display names of the athans in the order they are offered
+        """
+        return self._names
+
+    def by_name(self, name: str):
+        """
+        :param str name: athan display name (e.g. "Abdul-Basit (Takbeer only)")
+        :return Athan: the catalog entry or None if it's not in the catalog
+        """
+        return self._by_name.get(name)
+
+    def by_filename(self, filename: str):
+        """
+        :param str filename: athan filename (e.g. "Abdul-Basit_(Takbeer_only).mp3")
+        :return Athan: the catalog entry or None if it's not in the catalog
+        """
+        return self._by_filename.get(filename)
+
+    def display_name(self, filename: str) -> str:
+        """
+        :param str filename: athan filename
+        :return str: display name of the athan, or the filename if it's not in the catalog
+        """
+        athan = self._by_filename.get(filename)
+        return athan.name if athan is not None else filename
+
+    def is_packed(self, filename: str) -> bool:
+        """
+        :param str filename: athan filename
+        :return bool: whether the athan is bundled, in the athans pack or as a source recording
+        """
+        if self.pack is None:
+            return filename in self._sources
+        return filename in self.pack
+
+    def download_path(self, filename: str) -> str:
+        """
+        :param str filename: athan filename
+        :return str: path of the athan in the downloads directory
+        """
+        return os.path.join(self.directory, filename)
+
+    def path(self, filename: str) -> str:
+        """
+        :param str filename: athan filename
+        :return str: path of the downloaded athan, or of the bundled one if it wasn't downloaded
+        """
+        if filename not in self._on_disk and self.is_packed(filename):
+            if self.pack is None:
+                return os.path.join(self.sources_dir, filename)
+            return pack.ref(filename)
+
+        return self.download_path(filename)
+
+    def is_available(self, filename: str) -> bool:
+        """
+        :param str filename: athan filename
+        :return bool: whether the athan is in the catalog & bundled or downloaded
+        """
+        athan = self._by_filename.get(filename)
+        return athan is not None and athan.available
+
+    def mark_available(self, filename: str, available: bool = True):
+        """method to record that an athan was downloaded (or removed)
+
+        :param str filename: athan filename
+        :param bool available: whether the athan is on disk
+        """
+        if available:
+            self._on_disk.add(filename)
+        else:
+            self._on_disk.discard(filename)
+
+        athan = self._by_filename.get(filename)
+        if athan is not None:
+            athan.available = available or self.is_packed(filename)
+
+
+@functools.lru_cache(maxsize=None)
+def get_catalog() -> AthanCatalog:
+    """
+    :return AthanCatalog: the athans catalog, loaded once on first use
+    """
+    return AthanCatalog()
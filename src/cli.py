@@ -0,0 +1,203 @@
+"""
+headless command line interface for querying prayer times from the saved settings,
+doesn't import any GUI or audio module so it can be used from scripts & cron jobs
+
+usage: python -m src.cli today|next|range|prefetch [options]
+"""
+import os
+import sys
+import json
+import argparse
+import datetime
+
+from src.modifiedpt import ModifiedPrayerTimes
+from src.settings import SettingsStore
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+
+
+class HeadlessApp:
+    """minimal stand-in for the Athany app object, provides the saved settings
+    & location metadata needed by ModifiedPrayerTimes without any GUI"""
+
+    def __init__(self):
+        self.settings = SettingsStore(filename="athany-config.json",
+                                      path=DATA_DIR, read_only=True)
+        self.displayed_times = ["Fajr", "Sunrise",
+                                "Dhuhr", "Asr", "Maghrib", "Isha"]
+        self.calculation_data = None
+
+        location = self.settings["-location-"] or {}
+        if location.get("-coordinates-", None) is None:
+            return
+
+        if not self.settings["-offset-"]:
+            self.settings["-offset-"] = {f"-{prayer}-": 0
+                                         for prayer in self.displayed_times}
+        if not self.settings["-custom-angles-"]:
+            self.settings["-custom-angles-"] = [18, 18]
+
+        json_month_file = os.path.join(
+            DATA_DIR, f"{location['-city-']}-{location['-country-']}.json")
+        try:
+            with open(json_month_file, encoding="utf-8") as location_metadata:
+                self.calculation_data = json.load(location_metadata)
+        except (OSError, ValueError):
+            # the default method is only used if there is no saved method
+            self.calculation_data = {"method": {"id": 4}}
+
+
+def furood_dict(furood: dict) -> dict:
+    """
+    :param dict furood: prayer name -> datetime dictionary
+    :return dict: prayer name -> ISO 8601 string dictionary
+    """
+    return {prayer: time.isoformat() for prayer, time in furood.items()}
+
+
+def print_furood(date: datetime.date, furood: dict):
+    """print the prayer times of the given date as aligned text"""
+    print(date.isoformat())
+    for prayer, time in furood.items():
+        print(f"  {prayer:<8} {time.strftime('%I:%M %p')}")
+
+
+def cmd_today(pt: ModifiedPrayerTimes, args):
+    """print the prayer times of today (or the given date)"""
+    date = args.date or pt.now.date()
+    pt.update_current_furood(datetime.datetime(date.year, date.month, date.day))
+
+    if args.json:
+        print(json.dumps({"date": date.isoformat(),
+                          "times": furood_dict(pt.current_furood)}))
+    else:
+        print_furood(date, pt.current_furood)
+
+
+def cmd_next(pt: ModifiedPrayerTimes, args):
+    """print the upcoming prayer & the time remaining until it"""
+    pt.update_current_and_next_prayer()
+    name, time = pt.upcoming_fard
+    remaining = time - pt.now
+
+    if args.json:
+        print(json.dumps({"current": pt.current_fard[0], "next": name,
+                          "time": time.isoformat(),
+                          "remaining": int(remaining.total_seconds())}))
+    else:
+        print(f"{name} at {time.strftime('%I:%M %p')} (in {remaining})")
+
+
+def cmd_range(pt: ModifiedPrayerTimes, args):
+    """print the prayer times of every date between start & end (inclusive)"""
+    days = []
+    date = args.start
+    while date <= args.end:
+        pt.update_current_furood(datetime.datetime(date.year, date.month, date.day))
+        if args.json:
+            days.append({"date": date.isoformat(),
+                         "times": furood_dict(pt.current_furood)})
+        else:
+            print_furood(date, pt.current_furood)
+        date += datetime.timedelta(days=1)
+
+    if args.json:
+        print(json.dumps(days))
+
+
+def cmd_prefetch(args) -> int:
+    """download the missing athans (every athan in the catalog or the given ones)"""
+    # only imported here so the prayer times commands don't pay for the download machinery
+    from src import downloads
+    from src.catalog import get_catalog
+
+    athans = get_catalog()
+    filenames = []
+    for name in args.athans or athans.names():
+        athan = athans.by_name(name) or athans.by_filename(name)
+        if athan is None:
+            print(f"Unknown athan: {name}", file=sys.stderr)
+            return 2
+        filenames.append(athan.filename)
+
+    def on_progress(done, total):
+        if not args.json:
+            print(f"\r{done / 1024 ** 2:.1f}/{total / 1024 ** 2:.1f} MB",
+                  end="", file=sys.stderr, flush=True)
+
+    result = downloads.prefetch(filenames, athans, workers=args.workers or downloads.PREFETCH_WORKERS,
+                                on_progress=on_progress)
+    if args.json:
+        print(json.dumps({"downloaded": result.downloaded, "skipped": result.skipped,
+                          "failed": result.failed, "bytes": result.bytes,
+                          "seconds": round(result.seconds, 3),
+                          "throughput": round(result.throughput)}))
+    else:
+        print(f"\r{result}", file=sys.stderr if result.failed else sys.stdout)
+        for filename in result.failed:
+            print(f"  failed: {filename}", file=sys.stderr)
+
+    return 1 if result.failed else 0
+
+
+def parse_args(argv=None):
+    """parse the command line arguments of the headless interface"""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--json", action="store_true",
+                        help="print the output as json")
+
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="query athany prayer times without the GUI")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    today = commands.add_parser("today", parents=[common],
+                                help="prayer times of today")
+    today.add_argument("--date", type=datetime.date.fromisoformat,
+                       help="show the prayer times of this date (YYYY-MM-DD) instead")
+    today.set_defaults(func=cmd_today)
+
+    upcoming = commands.add_parser("next", parents=[common],
+                                   help="upcoming prayer & remaining time")
+    upcoming.set_defaults(func=cmd_next)
+
+    date_range = commands.add_parser("range", parents=[common],
+                                     help="prayer times of a date range")
+    date_range.add_argument("start", type=datetime.date.fromisoformat,
+                            help="first date (YYYY-MM-DD)")
+    date_range.add_argument("end", type=datetime.date.fromisoformat,
+                            help="last date (YYYY-MM-DD)")
+    date_range.set_defaults(func=cmd_range)
+
+    prefetch = commands.add_parser("prefetch", parents=[common],
+                                   help="download the missing athans")
+    prefetch.add_argument("athans", nargs="*",
+                          help="athan display names or filenames (default: every athan)")
+    prefetch.add_argument("--workers", type=int,
+                          help="number of concurrent downloads (default: the connection pool size)")
+    prefetch.set_defaults(func=cmd_prefetch)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """entry point of the headless interface
+
+    :return int: process exit code
+    """
+    args = parse_args(argv)
+    if args.command == "prefetch":  # doesn't need a saved location
+        return args.func(args)
+
+    app = HeadlessApp()
+    if app.calculation_data is None:
+        print("No saved location, start athany once and save your location first",
+              file=sys.stderr)
+        return 1
+
+    args.func(ModifiedPrayerTimes(app), args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
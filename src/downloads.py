@@ -0,0 +1,314 @@
+"""
+module for downloading athans in the background with resume support & integrity checks
+"""
+import os
+import time
+import hashlib
+import threading
+import concurrent.futures
+
+from src import network
+from src.catalog import get_catalog
+
+# the source recordings of the athans pack, athans that aren't bundled are downloaded from there
+ATHANS_URL = "https://github.com/0xzer0x/athany/raw/master/assets/athans/"
+
+# event written to the window with a (filename, status, downloaded bytes, total bytes) value,
+# status is one of "progress", "done", "failed" or "cancelled"
+DOWNLOAD_EVENT = "-DOWNLOAD-"
+PROGRESS_INTERVAL = 0.25  # seconds between progress events
+PREFETCH = "*"  # filename of the events sent by a bulk prefetch
+
+# chunk sizes adapt to the connection speed so that each read takes about
+# CHUNK_TARGET seconds, which bounds the time a cancel request waits
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 1024 * 1024
+CHUNK_TARGET = 0.2
+
+# bulk prefetch workers, matches the connection pool size of the shared session
+PREFETCH_WORKERS = network.POOL_SIZE
+
+
+def file_digest(filename: str):
+    """
+    :param str filename: path of the file to hash
+    :return tuple[int, hashlib._Hash]: size & sha256 of the file contents
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(filename, "rb") as data:
+        for block in iter(lambda: data.read(MAX_CHUNK), b""):
+            digest.update(block)
+            size += len(block)
+
+    return size, digest
+
+
+def is_valid(filename: str, expected=None) -> bool:
+    """
+    :param str filename: path of a downloaded athan
+    :param catalog.Athan expected: catalog entry of the athan
+    :return bool: whether the file exists & matches its catalog entry (if there is one)
+    """
+    if not os.path.exists(filename):
+        return False
+    if expected is None:
+        return True
+    if os.path.getsize(filename) != expected.size:
+        return False
+
+    return file_digest(filename)[1].hexdigest() == expected.sha256
+
+
+class DownloadCancelled(Exception):
+    """raised in the download thread when the download is cancelled"""
+
+
+def fetch(url: str, saved_file: str, expected=None,
+          cancelled: threading.Event = None, on_chunk=None):
+    """function to download a file, resuming the partial .part file if a previous download was interrupted
+
+    :param str url: url of the file
+    :param str saved_file: path to save the file to
+    :param catalog.Athan expected: catalog entry (size & sha256) to verify the file against
+    :param threading.Event cancelled: event that is set to stop the download
+    :param callable on_chunk: called with (chunk size, downloaded bytes, total bytes) after every chunk
+    :raises DownloadCancelled: if the download is cancelled
+    :raises ValueError: if the downloaded file doesn't match the catalog
+    """
+    if cancelled is not None and cancelled.is_set():
+        raise DownloadCancelled(saved_file)
+
+    part_file = saved_file + ".part"
+    os.makedirs(os.path.dirname(saved_file), exist_ok=True)
+
+    # hash the bytes already on disk so the whole file is verified after resuming
+    offset, digest = 0, hashlib.sha256()
+    if os.path.exists(part_file):
+        offset, digest = file_digest(part_file)
+
+    if expected is not None and offset >= expected.size:
+        offset, digest = 0, hashlib.sha256()  # complete or corrupt, start over
+
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    with network.get(url, stream=True, headers=headers) as res:
+        if res.status_code == 200:  # the server ignored the range, start over
+            offset, digest = 0, hashlib.sha256()
+        elif res.status_code != 206:
+            raise ValueError(f"unexpected status code {res.status_code}")
+
+        total = offset + int(res.headers.get("content-length", 0))
+        if expected is not None:
+            total = expected.size
+
+        chunk_size = MIN_CHUNK * 4
+        with open(part_file, "ab" if offset else "wb") as athan_file:
+            while True:
+                if cancelled is not None and cancelled.is_set():
+                    raise DownloadCancelled(saved_file)
+
+                started = time.monotonic()
+                chunk = res.raw.read(chunk_size, decode_content=True)
+                if not chunk:
+                    break
+                elapsed = time.monotonic() - started
+
+                athan_file.write(chunk)
+                digest.update(chunk)
+                offset += len(chunk)
+
+                if elapsed < CHUNK_TARGET / 2:
+                    chunk_size = min(chunk_size * 2, MAX_CHUNK)
+                elif elapsed > CHUNK_TARGET * 2:
+                    chunk_size = max(chunk_size // 2, MIN_CHUNK)
+
+                if on_chunk is not None:
+                    on_chunk(len(chunk), offset, total)
+
+    if expected is not None and (offset != expected.size or
+                                 digest.hexdigest() != expected.sha256):
+        os.remove(part_file)
+        raise ValueError("downloaded file doesn't match the athans catalog")
+    if expected is None and total and offset != total:
+        raise ValueError("incomplete download")
+
+    os.replace(part_file, saved_file)
+
+
+class PrefetchResult:
+    """class that summarizes a bulk prefetch of athans"""
+
+    def __init__(self):
+        self.downloaded = []
+        self.skipped = []
+        self.failed = []
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """
+        :return float: aggregate download speed in bytes per second
+        """
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{len(self.downloaded)} downloaded, {len(self.skipped)} already present, "
+                f"{len(self.failed)} failed, {self.bytes / 1024 ** 2:.1f} MB in {self.seconds:.1f} s "
+                f"({self.throughput / 1024 ** 2:.2f} MB/s)")
+
+
+def prefetch(filenames: list, athans=None, base_url: str = ATHANS_URL,
+             workers: int = PREFETCH_WORKERS, cancelled: threading.Event = None,
+             on_progress=None) -> PrefetchResult:
+    """function to download the missing athans of the given list using a bounded pool of workers
+    that share the connections of the network session, packed athans & valid files already on disk are skipped
+
+    :param list[str] filenames: athan filenames to prefetch
+    :param catalog.AthanCatalog athans: catalog to verify the files against & keep current
+    :param str base_url: url the athan filenames are appended to
+    :param int workers: number of concurrent downloads
+    :param threading.Event cancelled: event that is set to stop the prefetch
+    :param callable on_progress: called with (downloaded bytes, total bytes) at most every PROGRESS_INTERVAL
+    :return PrefetchResult: summary of the prefetch
+    """
+    import requests
+
+    athans = get_catalog() if athans is None else athans
+    result = PrefetchResult()
+    missing = []
+    for filename in filenames:
+        if athans.is_packed(filename):
+            result.skipped.append(filename)
+        elif is_valid(athans.download_path(filename), athans.by_filename(filename)):
+            athans.mark_available(filename)
+            result.skipped.append(filename)
+        else:
+            missing.append(filename)
+
+    total = sum(athans.by_filename(filename).size for filename in missing
+                if athans.by_filename(filename) is not None)
+    lock = threading.Lock()
+    last_event = [0.0]
+
+    def on_chunk(size, *_):
+        with lock:
+            result.bytes += size
+            now = time.monotonic()
+            if on_progress is not None and now - last_event[0] >= PROGRESS_INTERVAL:
+                last_event[0] = now
+                on_progress(result.bytes, total)
+
+    def fetch_one(filename):
+        fetch(base_url + filename, athans.download_path(filename),
+              athans.by_filename(filename), cancelled, on_chunk)
+        athans.mark_available(filename)
+
+    started = time.monotonic()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                               thread_name_prefix="athan-prefetch") as executor:
+        futures = {executor.submit(fetch_one, filename): filename for filename in missing}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+                result.downloaded.append(futures[future])
+            except (DownloadCancelled, requests.exceptions.RequestException, OSError, ValueError) as error:
+                print(f"[DEBUG] Prefetch failed: {futures[future]} ({error})")
+                result.failed.append(futures[future])
+    result.seconds = time.monotonic() - started
+
+    return result
+
+
+class DownloadManager:
+    """class that downloads athans on a worker thread, one athan or a bulk prefetch at a time,
+    and reports the progress to a window using thread-safe window events"""
+
+    def __init__(self, window, athans=None, base_url: str = ATHANS_URL):
+        self.window = window
+        self.athans = get_catalog() if athans is None else athans
+        self.base_url = base_url
+        self.current = None
+        self.last_prefetch = None
+        self._thread = None
+        self._cancelled = threading.Event()
+
+    @property
+    def active(self) -> bool:
+        """
+        :return bool: whether a download is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def _start(self, target, *args) -> bool:
+        if self.active:
+            return False
+
+        self._cancelled.clear()
+        self._thread = threading.Thread(target=target, args=args,
+                                        name="athan-download", daemon=True)
+        self._thread.start()
+        return True
+
+    def start(self, filename: str) -> bool:
+        """method to start downloading the given athan in the background
+
+        :param str filename: athan filename to download
+        :return bool: False if another download is still running
+        """
+        if self.active:
+            return False
+        self.current = filename
+        return self._start(self._run, filename)
+
+    def start_prefetch(self, filenames: list) -> bool:
+        """method to start prefetching the given athans in the background,
+        progress events are sent with PREFETCH as the filename
+
+        :param list[str] filenames: athan filenames to prefetch
+        :return bool: False if another download is still running
+        """
+        if self.active:
+            return False
+        self.current = PREFETCH
+        return self._start(self._run_prefetch, filenames)
+
+    def cancel(self):
+        """method to stop the running download, partial files are kept to be resumed later"""
+        self._cancelled.set()
+
+    def _send(self, filename: str, status: str, done: int = 0, total: int = 0):
+        self.window.write_event_value(
+            DOWNLOAD_EVENT, (filename, status, done, total))
+
+    def _run(self, filename: str):
+        import requests
+
+        last_event = [0.0]
+
+        def on_chunk(_, done, total):
+            now = time.monotonic()
+            if now - last_event[0] >= PROGRESS_INTERVAL:
+                last_event[0] = now
+                self._send(filename, "progress", done, total)
+
+        try:
+            fetch(self.base_url + filename, self.athans.download_path(filename),
+                  self.athans.by_filename(filename), self._cancelled, on_chunk)
+        except DownloadCancelled:
+            print(f"[DEBUG] Download cancelled: {filename}")
+            self._send(filename, "cancelled")
+        except (requests.exceptions.RequestException, OSError, ValueError) as error:
+            print(f"[DEBUG] Download failed: {filename} ({error})")
+            self._send(filename, "failed")
+        else:
+            self.athans.mark_available(filename)
+            self._send(filename, "done")
+
+    def _run_prefetch(self, filenames: list):
+        self.last_prefetch = prefetch(filenames, self.athans, self.base_url,
+                                      cancelled=self._cancelled,
+                                      on_progress=lambda done, total: self._send(PREFETCH, "progress", done, total))
+        print(f"[DEBUG] Prefetch: {self.last_prefetch}")
+        self._send(PREFETCH, "cancelled" if self._cancelled.is_set() else "done",
+                   len(self.last_prefetch.downloaded), len(self.last_prefetch.failed))
@@ -1,20 +1,11 @@
 """Module that contains custom GUI elements used"""
 import os
-from pygame import mixer
+import time
 import PySimpleGUI as sg
-from psgtray import SystemTray
-
-
-DATA_DIR = os.path.join(os.path.dirname(
-    os.path.abspath(__file__)), "Data")
-ATHANS_DIR = os.path.join(DATA_DIR, "Athans")
-
-with open(os.path.join(DATA_DIR, "app_icon.dat"), mode="rb") as icon:
-    APP_ICON = icon.read()
-with open(os.path.join(DATA_DIR, "toggle_off.dat"), mode="rb") as toff:
-    TOGGLE_OFF_B64 = toff.read()
-with open(os.path.join(DATA_DIR, "toggle_on.dat"), mode="rb") as ton:
-    TOGGLE_ON_B64 = ton.read()
+from src import assets, audio, pack
+from src.downloads import DownloadManager, DOWNLOAD_EVENT, PREFETCH
+from src.ipc import QueryServer
+from src.scheduler import Scheduler, next_second, next_minute, next_midnight
 
 
 class TranslatedText(sg.Text):
@@ -43,13 +34,70 @@ class TranslatedButton(sg.Button):
         super().__init__(button_text=translator.translate(text), **kwargs)
 
 
+class ViewModel:
+    """class that keeps the last rendered value of each main window element
+    & only sends the values that actually changed to Tk/the system tray"""
+
+    TOOLTIP_KEY = "-SYS-TRAY-TOOLTIP-"
+
+    def __init__(self, window):
+        self.window = window
+        self.rendered = {}
+        self.sent, self.skipped = 0, 0
+
+    def update(self, key, value):
+        """method to update the value of the given element if it differs from the rendered one
+
+        :param str key: element key (or ViewModel.TOOLTIP_KEY for the system tray tooltip)
+        :param value: new value of the element
+        :return bool: whether the update was sent to the UI
+        """
+        if key in self.rendered and self.rendered[key] == value:
+            self.skipped += 1
+            return False
+
+        if key == self.TOOLTIP_KEY:
+            self.window.sys_tray.set_tooltip(value)
+        else:
+            self.window[key].update(value=value)
+
+        self.rendered[key] = value
+        self.sent += 1
+        return True
+
+    def invalidate(self, key=None):
+        """method to forget the rendered value of the given element (or all elements),
+        forcing the next update to be sent to the UI
+
+        :param str key: element key to invalidate, None to invalidate all elements
+        """
+        if key is None:
+            self.rendered.clear()
+        else:
+            self.rendered.pop(key, None)
+
+
 class MainWindow(sg.Window):
     """A modified version of PySimpleGUI.Window
      that contains methods for handling & modifying the main UI window"""
 
-    def __init__(self, parent, **kwargs):
-        self.sys_tray = None
+    def __init__(self, parent, previous=None, **kwargs):
         self.parent = parent
+        self.scheduler = Scheduler()
+        self.view = ViewModel(self)
+        self.hidden = False
+        self.reload_requested = False
+        if previous is None:
+            self.sys_tray = None
+            self.downloads = DownloadManager(self)
+            self.query_server = QueryServer(parent, self)
+        else:  # hot reload, the tray icon, running downloads & query server send their events to this window now
+            self.sys_tray = previous.sys_tray
+            self.sys_tray.window = self
+            self.downloads = previous.downloads
+            self.downloads.window = self
+            self.query_server = previous.query_server
+            self.query_server.window = self
         super().__init__(**kwargs)
         self.disable_debugger()
 
@@ -61,12 +109,9 @@ class MainWindow(sg.Window):
                 title="Athany 🕌", message=self.parent.translator.translate(f"It's time for {self.parent.pt.current_fard[0]} prayer"))
 
             # play athan sound from user athan sound settings (if athan sound not muted)
+            # failures are reported back by the audio player as an audio.ERROR_EVENT
             if not self.parent.settings["-mute-athan-"]:
-                try:
-                    self.parent.play_current_athan()
-                except RuntimeError:
-                    print(
-                        "[DEBUG] Couldn't play athan audio, rechoose your athan in the app settings")
+                self.parent.play_current_athan()
 
     def highlight_current_fard_in_ui(self):
         """method to highlight the current fard in the main app UI
@@ -97,49 +142,149 @@ class MainWindow(sg.Window):
         # Highlight current fard in main window
         self.highlight_current_fard_in_ui()
 
+        # the upcoming fard changes whenever the current one does
+        self.schedule_prayer_timer()
+
         # If current_furood dict was changed,
         # then update the ui with the next day prayers starting from Fajr
         if prayer_times_changed:
-            for prayer, time in self.parent.pt.current_furood.items():
-                self[f"-{prayer.upper()}-TIME-"].update(
-                    value=time.strftime("%I:%M %p"))
+            for prayer, prayer_time in self.parent.pt.current_furood.items():
+                self.view.update(f"-{prayer.upper()}-TIME-",
+                                 prayer_time.strftime("%I:%M %p"))
 
     # ---------------------------- event handlers ---------------------------- #
 
-    def run_event_loop(self, timeout=100):
-        """main window event handling loop
+    def schedule_prayer_timer(self):
+        """method to (re)schedule the timer of the upcoming fard
+        & the timer that pre-arms its athan a few seconds before it"""
+        prayer_time = self.parent.pt.upcoming_fard[1].timestamp()
+        self.scheduler.schedule("prayer", prayer_time)
+        self.scheduler.schedule(
+            "prearm", prayer_time - self.parent.settings["-prearm-seconds-"])
+
+    def schedule_locations_timer(self):
+        """method to (re)schedule the timer of the earliest upcoming prayer of the other locations"""
+        deadline = self.parent.locations.next_deadline()
+        if deadline is None:
+            self.scheduler.cancel("locations")
+        else:
+            self.scheduler.schedule("locations", deadline)
+
+    def refresh_locations_in_ui(self):
+        """method to display the upcoming prayer of every other monitored location,
+        only called when one of them changes so it doesn't add to the cost of each tick"""
+        translate = self.parent.translator.translate
+        lines = [f"{location.name}: {translate(location.upcoming[0])} "
+                 f"{location.upcoming_local_time().strftime('%I:%M %p')}"
+                 for location in self.parent.locations]
+        self.view.update("-LOCATIONS-", "\n".join(lines))
+        self["-LOCATIONS-"].update(visible=bool(lines))
+
+    def update_countdown(self):
+        """method to update the next prayer & remaining time in the main window & tray tooltip"""
+        # get remaining time till next prayer
+        time_d = self.parent.pt.upcoming_fard[1] - self.parent.pt.now
+
+        # update the main window with the next prayer and remaining time
+        self.view.update("-NEXT-PRAYER-", self.parent.pt.upcoming_fard[0])
+        self.view.update("-TIME-D-", str(time_d))
+
+        # update system tray tooltip also
+        self.view.update(ViewModel.TOOLTIP_KEY,
+                         f"{self.parent.pt.upcoming_fard[0]} in {time_d}")
+
+    def update_dates(self):
+        """method to update the gregorian & hijri dates displayed in the main window"""
+        self.view.update("-TODAY-", self.parent.pt.now.strftime("%a %d %b %y"))
+        self.view.update("-TODAY_HIJRI-", self.parent.get_hijri_date())
+
+    def handle_timers(self, timers):
+        """method to run the updates of the timers that are due & schedule their next deadlines
+
+        :param list[str] timers: names of the due timers
         """
-        win2_active = False
-        while True:
-            self.parent.pt.update_time()
+        now = time.time()
+        self.parent.pt.update_time()
 
+        if "prayer" in timers:
             if self.parent.pt.prayer_time_came():
                 pt_changed = self.parent.pt.update_current_and_next_prayer()
                 self.show_notification_and_athan()
                 self.refresh_prayers_in_ui(pt_changed)
+            else:  # woke up early (e.g. clock change), wait for the actual prayer time
+                self.schedule_prayer_timer()
+
+        if "prearm" in timers:
+            self.parent.prearm_current_athan()
+
+        if "locations" in timers:
+            for location, prayer in self.parent.locations.pop_due(now):
+                message = self.parent.translator.translate(f"It's time for {prayer} prayer")
+                self.sys_tray.show_message(title="Athany 🕌", message=f"{message} ({location.name})")
+            self.refresh_locations_in_ui()
+            self.schedule_locations_timer()
+
+        if "second" in timers:
+            self.update_countdown()
+            self.scheduler.schedule("second", next_second(now))
+
+        if "minute" in timers:
+            self.view.update("-CURRENT-TIME-",
+                             self.parent.pt.now.strftime("%I:%M %p"))
+            self.scheduler.schedule("minute", next_minute(now))
+
+        if "midnight" in timers:
+            self.update_dates()
+            self.scheduler.schedule(
+                "midnight", next_midnight(self.parent.pt.now))
+
+    def handle_download_event(self, download, settings_window=None):
+        """method to handle the events sent by the athan download thread
+
+        :param tuple download: (filename, status, downloaded bytes, total bytes) event value
+        :param SettingsWindow settings_window: the settings window if it's open
+        """
+        athan_filename, status, done, total = download
+        if status == "progress":
+            if settings_window is not None:
+                settings_window["-DOWNLOAD-PROGRESS-"].update(
+                    current_count=done, max=total or done)
+            return
+
+        if athan_filename == PREFETCH:
+            if status == "done":
+                self.sys_tray.show_message(title="Download complete",
+                                           message=str(self.downloads.last_prefetch))
+        elif status == "done":  # if all went well, set as new athan and play audio
+            self.parent.settings["-athan-sound-"] = athan_filename
+            self.parent.play_current_athan()
+        elif status == "failed":  # something messed up during download or no internet
+            self.sys_tray.show_message(
+                title="Download Failed", message=f"Couldn't download athan file: {athan_filename}")
 
-            # get remaining time till next prayer
-            time_d = self.parent.pt.upcoming_fard[1] - self.parent.pt.now
-
-            # update the main window with the next prayer and remaining time
-            self["-NEXT-PRAYER-"].update(
-                value=self.parent.pt.upcoming_fard[0])
-            self["-TIME-D-"].update(value=str(time_d))
-
-            # update the current dates
-            self["-CURRENT-TIME-"].update(
-                value=self.parent.pt.now.strftime("%I:%M %p"))
-            self["-TODAY-"].update(
-                value=self.parent.pt.now.strftime("%a %d %b %y"))
-            self["-TODAY_HIJRI-"].update(
-                value=self.parent.get_hijri_date())
+        if settings_window is not None:
+            settings_window.finish_download_process()
 
-            # update system tray tooltip also
-            self.sys_tray.set_tooltip(
-                f"{self.parent.pt.upcoming_fard[0]} in {time_d}")
+    def run_event_loop(self, timeout=100):
+        """main window event handling loop, blocks until the next timer deadline or window event
 
+        :param int timeout: the maximum time to block while the settings window is open,
+        as its events are read from this loop
+        """
+        win2_active = False
+        settings_window = None
+        self.schedule_prayer_timer()
+        self.schedule_locations_timer()
+        self.refresh_locations_in_ui()
+        self.handle_timers(["second", "minute", "midnight"])
+        while True:
             # main event reading
-            event1, values1 = self.read(timeout=timeout)
+            event1, values1 = self.read(timeout=self.scheduler.timeout_ms(
+                time.time(), timeout if win2_active else None))
+
+            due_timers = self.scheduler.pop_due(time.time())
+            if due_timers:
+                self.handle_timers(due_timers)
 
             if event1 == self.sys_tray.key:
                 event1 = values1[event1]
@@ -150,94 +295,174 @@ class MainWindow(sg.Window):
             if event1 == sg.TIMEOUT_KEY:
                 pass
 
+            elif event1 == DOWNLOAD_EVENT:
+                self.handle_download_event(
+                    values1[event1], settings_window if win2_active else None)
+
+            elif event1 == audio.ERROR_EVENT:
+                athan_path, error = values1[event1]
+                print(f"[DEBUG] Couldn't play athan audio ({error})")
+                self.sys_tray.show_message(
+                    title="Athan Failed",
+                    message=f"Couldn't play athan file: {os.path.basename(pack.parse_ref(athan_path) or athan_path)}, "
+                            "rechoose your athan in the app settings")
+
             elif event1 in (sg.WIN_CLOSED, "-EXIT-", "Exit"):
+                # Debugging
+                print(
+                    f"[DEBUG] UI updates sent: {self.view.sent}, skipped: {self.view.skipped}")
+                if settings_window is not None and not settings_window.discarded:
+                    settings_window.close()
+                self.downloads.cancel()
+                self.query_server.close()
+                self.parent.pt.state_file.close()
+                # release the timetable files so a restarted app can evict them
+                self.parent.locations.close()
+                self.parent.pt.timetable.close()
                 self.sys_tray.close()
                 del self.sys_tray
                 break
 
+            elif event1 == "-RELOAD-UI-":  # theme or language changed, the window is rebuilt
+                self.reload_requested = True
+                break
+
             elif event1 in (sg.WIN_CLOSE_ATTEMPTED_EVENT, "Hide Window"):
                 self.hide()
+                self.hidden = True
                 self.sys_tray.show_icon()
                 self.sys_tray.show_message(title="Athany minimized to system tray",
                                            message="To completely close the app, press 'Exit'")
 
             elif event1 in ("Show Window", sg.EVENT_SYSTEM_TRAY_ICON_DOUBLE_CLICKED):
                 self.un_hide()
+                self.hidden = False
                 self.bring_to_front()
 
             elif event1 in ("-STOP-ATHAN-", "Stop athan"):
-                mixer.music.unload()
+                audio.stop()
 
             # if clicked settings button,
             # open up the settings window and read values from it along with the main window
             elif event1 in ("-SETTINGS-", "Settings") and not win2_active:
                 win2_active = True
-                settings_window: SettingsWindow = self.parent.generate_settings_window()
+                if settings_window is None:
+                    settings_window: SettingsWindow = self.parent.generate_settings_window()
+                else:  # built on the first open, hidden when closed
+                    settings_window.show()
 
             # If 2nd window (settings window) is open, run the settings window event handling method
             if win2_active:
                 win2_active = settings_window.run_event_loop()
-            else:
-                settings_window = None
+                if settings_window.discarded:
+                    settings_window = None
 
     # ---------------------- startup & shutdown methods ---------------------- #
 
     def start_system_tray(self):
         """starts the SystemTray object and instantiates it"s menu and tooltip
         """
+        from psgtray import SystemTray
+
         menu = ["", ["Show Window", "Hide Window", "---", "Stop athan",
                      "Settings", "Exit"]]
         self.sys_tray = SystemTray(menu=menu, tooltip="Next Prayer",
-                                   window=self, icon=APP_ICON)
+                                   window=self, icon=assets.get("app_icon"))
         self.sys_tray.show_message(
             title="Athany", message="Choose 'Hide Window' or close the window to minimize application to system tray")
 
 
 class SettingsWindow(sg.Window):
     """A modified version of PySimpleGUI.Window
-     that contains methods for handling & modifying the settings window events/elements"""
+     that contains methods for handling & modifying the settings window events/elements,
+     the window is hidden when it's closed & shown again the next time the settings are opened"""
 
-    def __init__(self, parent, **kwargs):
+    def __init__(self, parent, tab_builders=None, **kwargs):
         self.parent = parent
+        self.tab_builders = dict(tab_builders or {})
+        self.discarded = False
+        self._toggle_images = {}
         super().__init__(**kwargs)
 
+    def is_built(self, tab_key: str) -> bool:
+        """
+        :param str tab_key: key of a settings tab
+        :return bool: whether the elements of the tab were built
+        """
+        return tab_key not in self.tab_builders
+
+    def build_tab(self, tab_key: str):
+        """method to build the elements of the given tab the first time it's selected
+
+        :param str tab_key: key of the selected settings tab
+        """
+        builder = self.tab_builders.pop(tab_key, None)
+        if builder is not None:
+            # each lazy tab holds an empty column keyed "<tab key>BODY-" to extend
+            self.extend_layout(self[tab_key[:-1] + "-BODY-"], builder())
+
+    def toggle_image(self, state: bool):
+        """
+        :param bool state: toggle state
+        :return tkinter.PhotoImage: toggle image of the given state, decoded once per window
+        """
+        if state not in self._toggle_images:
+            self._toggle_images[state] = sg.tk.PhotoImage(
+                data=assets.get("toggle_on" if state else "toggle_off"))
+        return self._toggle_images[state]
+
     def change_toggle_button_state(self, key):
         """method to toggle the state of a button using it's metadata attribute
 
         :param str key: toggle button key in the window
         """
         self[key].metadata = not self[key].metadata
-        self[key].update(
-            image_data=TOGGLE_ON_B64 if self[key].metadata else TOGGLE_OFF_B64)
+        self[key].Widget.configure(image=self.toggle_image(self[key].metadata))
 
-    def start_download_process(self, athan_filename):
-        """method to handle downloading of athan file"""
-        self["-DONE-"].update(disabled=True)
-        self["-RESTART-"].update(disabled=True)
-        self["-EXIT-"].update(disabled=True)
-        self["-DISPLAYED-MSG-"].update(
-            value="Establishing connection...")
-        self.refresh()
-
-        mixer.music.unload()
-
-        # run the download function to get athan from archive
-        downloaded = self.parent.download_athan(athan_filename)
-        if downloaded:  # if all went well, set as new athan and play audio
-            self.parent.settings["-athan-sound-"] = athan_filename
-            self.parent.play_current_athan()
+    def show(self):
+        """method to show the hidden settings window again, the elements that can change
+        while it's hidden (athan choice & download progress) are refreshed first"""
+        if not self.parent.window.downloads.active:
+            self.finish_download_process()
+        self.un_hide()
+        self.bring_to_front()
 
-        else:  # something messed up during download or no internet
+    def start_download_process(self, athan_filename):
+        """method to start downloading an athan file in the background,
+        the main window keeps handling its events while the download thread runs"""
+        audio.stop()
+        if not self.parent.window.downloads.start(athan_filename):
+            return
+
+        self["-DROPDOWN-ATHANS-"].update(disabled=True)
+        self["-PREFETCH-ATHANS-"].update(disabled=True)
+        self["-DISPLAYED-MSG-"].update(value="Downloading")
+        self["-DOWNLOAD-PROGRESS-"].update(current_count=0)
+        self["-DOWNLOAD-ROW-"].update(visible=True)
+
+    def start_prefetch_process(self):
+        """method to start downloading every missing athan in the background"""
+        filenames = [athan.filename for athan in self.parent.athans
+                     if not athan.available]
+        if not self.parent.window.downloads.start_prefetch(filenames):
+            return
+
+        self["-DROPDOWN-ATHANS-"].update(disabled=True)
+        self["-PREFETCH-ATHANS-"].update(disabled=True)
+        self["-DISPLAYED-MSG-"].update(value="Downloading")
+        self["-DOWNLOAD-PROGRESS-"].update(current_count=0)
+        self["-DOWNLOAD-ROW-"].update(visible=True)
+
+    def finish_download_process(self):
+        """method to restore the athan settings after a download finished or was cancelled"""
+        self["-DOWNLOAD-ROW-"].update(visible=False)
+        self["-PREFETCH-ATHANS-"].update(disabled=False)
+        self["-DISPLAYED-MSG-"].update(value="Current athan")
+        if self.parent.settings["-use-custom-athan-"]:
+            self["-DROPDOWN-ATHANS-"].update(value="Custom")
+        else:
             self["-DROPDOWN-ATHANS-"].update(
-                value=self.parent.settings["-athan-sound-"][:-4].replace("_", " "))
-            self.parent.window.sys_tray.show_message(
-                title="Download Failed", message=f"Couldn't download athan file: {athan_filename}")
-
-        self["-DISPLAYED-MSG-"].update(
-            value="Current athan")
-        self["-EXIT-"].update(disabled=False)
-        self["-RESTART-"].update(disabled=False)
-        self["-DONE-"].update(disabled=False)
+                value=self.parent.athans.display_name(self.parent.settings["-athan-sound-"]), disabled=False)
 
     def apply_calculation_changes(self):
         """method to apply changes made to prayer times calculation and display the new times"""
@@ -245,25 +470,62 @@ class SettingsWindow(sg.Window):
         self.parent.pt.update_current_and_next_prayer()
         self.parent.window.refresh_prayers_in_ui(True)
 
+    def apply_offset_changes(self):
+        """method to apply the prayer offsets set in the settings window & display the new times,
+        the offsets are added to the cached prayer times so nothing is recalculated"""
+        if self.offset_changed():
+            self.parent.pt.update_prayer_offset()
+            self.apply_calculation_changes()
+
     def offset_changed(self) -> bool:
         """method to check whether prayer offsets were changed & save their new values
         :return: (bool) boolean value to indicate whether prayer offsets changed or no
         """
         offset_changed = False
+        if not self.is_built("-OFFSET-TAB-"):
+            return offset_changed
+
         for prayer in self.parent.displayed_times:
             pt_offset = self[f"-{prayer.upper()}-OFFSET-"].get()
             if self.parent.settings["-offset-"][f"-{prayer}-"] != pt_offset:
                 self.parent.settings["-offset-"][f"-{prayer}-"] = pt_offset
-                self.parent.settings.save()
                 offset_changed = True
 
+        if offset_changed:
+            self.parent.settings.save()
+
         return offset_changed
 
+    def add_location(self, city: str, country: str):
+        """method to start monitoring the prayer times of the location entered in the locations tab
+
+        :param str city: entered city
+        :param str country: entered country
+        """
+        city, country = city.strip().capitalize(), country.strip().capitalize()
+        if len(city + country) < 4:
+            return
+        if len(country) == 2:
+            country = country.upper()
+
+        error = self.parent.add_location(city, country)
+        self["-LOCATIONS-MSG-"].update(value=error or "")
+        if error is None:
+            self["-NEW-LOCATION-CITY-"].update(value="")
+            self["-NEW-LOCATION-COUNTRY-"].update(value="")
+            self.refresh_locations()
+
+    def refresh_locations(self):
+        """method to display the monitored locations in the settings & main windows"""
+        self["-LOCATIONS-LIST-"].update(values=[location.name for location in self.parent.locations])
+        self.parent.window.refresh_locations_in_ui()
+        self.parent.window.schedule_locations_timer()
+
     def reset_prayer_offsets(self):
         """method to reset all prayer offsets to zero"""
         for prayer in self.parent.displayed_times:
-            self.parent.settings["-offset-"][f"-{prayer}-"] = 0
             self[f"-{prayer.upper()}-OFFSET-"].update(value=0)
+        self.apply_offset_changes()
 
     def run_event_loop(self, timeout=100):
         """method for handling events that come from the settings window
@@ -283,25 +545,35 @@ class SettingsWindow(sg.Window):
             action_type = values2.get("-DONE-", None)
             print("[DEBUG] Settings exit action:", action_type)
             self.parent.save_loc_check = self["-TOGGLE-SAVE-LOCATION-"].metadata
-            self.parent.settings["-custom-athan-"] = self["-CUSTOM-ATHAN-NAME-"].get()
+            if self.is_built("-CUSTOM-ATHAN-TAB-"):
+                self.parent.settings["-custom-athan-"] = self["-CUSTOM-ATHAN-NAME-"].get()
 
-            if self.offset_changed():
-                self.parent.pt.update_prayer_offset()
-                self.apply_calculation_changes()
+            self.apply_offset_changes()
+
+            if action_type in ("-RESTART-", "-EXIT-", "-RELOAD-"):
+                self.discarded = True
+                self.close()
+            else:  # kept to be shown again instead of being rebuilt
+                self.hide()
 
-            self.close()
             if action_type == "-RESTART-":
-                mixer.music.unload()
+                audio.stop()
                 self.parent.restart_app = True
                 self.parent.window.write_event_value("-EXIT-", None)
 
             elif action_type == "-EXIT-":
                 self.parent.window.write_event_value("-EXIT-", None)
 
+            elif action_type == "-RELOAD-":
+                self.parent.window.write_event_value("-RELOAD-UI-", None)
+
         elif event2 in ("-EXIT-", "-RESTART-"):
             self.write_event_value(
                 "-DONE-", event2)
 
+        elif event2 == "-SETTINGS-TABS-":
+            self.build_tab(values2[event2])
+
         elif event2.startswith("-TOGGLE-"):
             self.handle_toggle_event(event2)
 
@@ -332,6 +604,24 @@ class SettingsWindow(sg.Window):
         elif event2 == "-RESET-OFFSET-":
             self.reset_prayer_offsets()
 
+        elif event2.endswith("-OFFSET-"):  # live preview of the spun prayer offset
+            self.apply_offset_changes()
+
+        elif event2 == "-ADD-LOCATION-":
+            self.add_location(values2["-NEW-LOCATION-CITY-"], values2["-NEW-LOCATION-COUNTRY-"])
+
+        elif event2 == "-REMOVE-LOCATION-":
+            selected = self["-LOCATIONS-LIST-"].get_indexes()
+            if selected:
+                self.parent.remove_location(selected[0])
+                self.refresh_locations()
+
+        elif event2 == "-PREFETCH-ATHANS-":
+            self.start_prefetch_process()
+
+        elif event2 == "-CANCEL-DOWNLOAD-":
+            self.parent.window.downloads.cancel()
+
         return win_active
 
     def handle_toggle_event(self, toggle_key):
@@ -357,7 +647,7 @@ class SettingsWindow(sg.Window):
                     value="Custom")
             else:
                 self["-DROPDOWN-ATHANS-"].update(
-                    value=self.parent.settings["-athan-sound-"][:-4].replace("_", " "))
+                    value=self.parent.athans.display_name(self.parent.settings["-athan-sound-"]))
 
         elif toggle_key == "-TOGGLE-SAVE-LOCATION-":
             self.change_toggle_button_state(toggle_key)
@@ -369,33 +659,24 @@ class SettingsWindow(sg.Window):
         :param str dropdown_value: value chosen from the dropdown list
         """
         if dropdown_key == "-DROPDOWN-LANG-" and self.parent.settings["-lang-"] != dropdown_value:
+            # the windows are rebuilt in the new language without restarting the app
             self.parent.settings["-lang-"] = dropdown_value
-            self.parent.restart_app = self.parent.yes_or_no_popup(
-                "App language was changed, do you want to restart?")
-            if self.parent.restart_app:
-                self.write_event_value(
-                    "-DONE-", "-RESTART-")
+            self.write_event_value("-DONE-", "-RELOAD-")
 
         elif dropdown_key == "-DROPDOWN-THEMES-":
             self.parent.chosen_theme = dropdown_value
             if self.parent.chosen_theme != self.parent.settings["-theme-"]:
-                self.parent.restart_app = self.parent.yes_or_no_popup(
-                    "Theme was changed, Do you want to restart application?")
-                if self.parent.restart_app:
-                    self.write_event_value(
-                        "-DONE-", "-RESTART-")
+                self.parent.settings["-theme-"] = self.parent.chosen_theme
+                self.write_event_value("-DONE-", "-RELOAD-")
 
         elif dropdown_key == "-DROPDOWN-ATHANS-":
-            # get a list of all athans currently in folder
-            # as user might have downloaded before
-            downloaded_athans = os.listdir(ATHANS_DIR)
-            chosen_athan = f"{dropdown_value.replace(' ', '_')}.mp3"
-            if chosen_athan in downloaded_athans:  # athan is already in Athans directory
-                self.parent.settings["-athan-sound-"] = chosen_athan
+            chosen_athan = self.parent.athans.by_name(dropdown_value)
+            if chosen_athan.available:  # athan is bundled or was downloaded
+                self.parent.settings["-athan-sound-"] = chosen_athan.filename
                 self.parent.play_current_athan()
 
             else:  # athan is not on pc, will be downloaded from the internet
-                self.start_download_process(chosen_athan)
+                self.start_download_process(chosen_athan.filename)
 
             # Debugging
             print("[DEBUG] Current athan:",
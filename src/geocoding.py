@@ -0,0 +1,132 @@
+"""
+module for resolving city & country names to location data offline using the bundled city index
+"""
+import os
+import mmap
+import struct
+import functools
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+CITY_INDEX_FILE = os.path.join(DATA_DIR, "cities.dat")
+
+# file layout (all integers little-endian):
+#   header
+#   key offsets      uint32[count + 1]   offsets of the keys in the key blob
+#   key blob         b"city\0CC" utf-8 lowercased keys sorted by their bytes
+#   records          RECORD[count]       location data of each key
+#   timezone offsets uint32[tz_count + 1]
+#   timezone blob    IANA timezone names
+#   country blob     b"name\tCC\n" lines mapping lowercased country names to ISO codes
+MAGIC = b"ATCI"
+VERSION = 1
+HEADER = struct.Struct("<4sHIHII")  # magic, version, count, tz count, key blob size, tz blob size
+OFFSET = struct.Struct("<I")
+RECORD = struct.Struct("<iiHB")  # latitude * 1e5, longitude * 1e5, timezone index, method id
+COORDINATES_SCALE = 100000
+
+
+def city_key(city: str, country_code: str) -> bytes:
+    """
+    :param str city: city name
+    :param str country_code: ISO 3166-1 alpha-2 country code
+    :return bytes: key of the city in the index
+    """
+    return f"{city.strip().lower()}\0{country_code.upper()}".encode("utf-8")
+
+
+class CityIndex:
+    """class that provides O(log n) case-insensitive exact lookup of cities
+    in the sorted, array-backed city index file"""
+
+    def __init__(self, filename: str = CITY_INDEX_FILE):
+        with open(filename, "rb") as index_file:
+            self._data = mmap.mmap(index_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+
+        magic, version, self.count, tz_count, keys_size, tz_size = HEADER.unpack_from(
+            self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"invalid city index file: {filename}")
+
+        self._key_offsets = HEADER.size
+        self._keys = self._key_offsets + OFFSET.size * (self.count + 1)
+        self._records = self._keys + keys_size
+        self._tz_offsets = self._records + RECORD.size * self.count
+        self._tz_names = self._tz_offsets + OFFSET.size * (tz_count + 1)
+        self._tz_count = tz_count
+
+        countries = self._data[self._tz_names + tz_size:].decode("utf-8")
+        self.countries = dict(line.split("\t")
+                              for line in countries.splitlines() if line)
+
+    def _offset(self, table: int, index: int) -> int:
+        return OFFSET.unpack_from(self._data, table + OFFSET.size * index)[0]
+
+    def _key(self, index: int) -> bytes:
+        return self._data[self._keys + self._offset(self._key_offsets, index):
+                          self._keys + self._offset(self._key_offsets, index + 1)]
+
+    def _timezone(self, index: int) -> str:
+        return self._data[self._tz_names + self._offset(self._tz_offsets, index):
+                          self._tz_names + self._offset(self._tz_offsets, index + 1)].decode("utf-8")
+
+    def country_code(self, country: str):
+        """
+        :param str country: country name or ISO 3166-1 alpha-2/alpha-3 code
+        :return str: ISO 3166-1 alpha-2 code of the country or None if it's unknown
+        """
+        return self.countries.get(country.strip().lower())
+
+    def lookup(self, city: str, country: str):
+        """method to find the location data of the given city
+
+        :param str city: city name (case-insensitive)
+        :param str country: country name or code (case-insensitive)
+        :return dict: location data in the same format as the aladhan api metadata
+        (latitude, longitude, timezone & method id) or None if the city isn't in the index
+        """
+        country_code = self.country_code(country)
+        if country_code is None:
+            return None
+
+        key = city_key(city, country_code)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self.count or self._key(low) != key:
+            return None
+
+        latitude, longitude, timezone, method = RECORD.unpack_from(
+            self._data, self._records + RECORD.size * low)
+        return {"latitude": latitude / COORDINATES_SCALE,
+                "longitude": longitude / COORDINATES_SCALE,
+                "timezone": self._timezone(timezone),
+                "method": {"id": method}}
+
+
+@functools.lru_cache(maxsize=None)
+def get_city_index():
+    """
+    :return CityIndex: the bundled city index or None if it's missing or invalid
+    """
+    try:
+        return CityIndex()
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def lookup(city: str, country: str):
+    """function to find the location data of the given city in the bundled index
+
+    :param str city: city name (case-insensitive)
+    :param str country: country name or code (case-insensitive)
+    :return dict: location data or None if the city isn't in the index
+    """
+    index = get_city_index()
+    return index.lookup(city, country) if index is not None else None
@@ -0,0 +1,86 @@
+"""
+module for converting & formatting Hijri dates in the timezone of the chosen location
+"""
+import datetime
+from zoneinfo import ZoneInfo
+
+from src.translator import Translator
+
+
+class HijriDateService:
+    """class that provides the formatted Hijri date of the location's local date,
+    the formatted string is computed once per day & yearly conversion tables are cached"""
+
+    def __init__(self, timezone: str):
+        self.timezone = ZoneInfo(timezone)
+        self._formatted_date = None
+        self._formatted = None
+        self._year_tables = {}
+
+    @staticmethod
+    def format(hijri_date) -> str:
+        """
+        :param hijridate.Hijri hijri_date: hijri date to format
+        :return str: Arabic string of the given Hijri date ready to be displayed
+        """
+        unformatted_text = f"{hijri_date.day_name(language='ar')} {hijri_date.day} {hijri_date.month_name(language='ar')} {hijri_date.year}"
+        return Translator.display_ar_text(text=unformatted_text)
+
+    def formatted(self, date: datetime.date) -> str:
+        """method to get the formatted Hijri date of the given gregorian date,
+        the last formatted date is cached as it's requested until the day changes
+
+        :param datetime.date date: gregorian date to convert
+        :return str: Arabic string of the Hijri date
+        """
+        if date != self._formatted_date:
+            self._formatted = self.format(self.to_hijri(date))
+            self._formatted_date = date
+
+        return self._formatted
+
+    def today(self) -> str:
+        """
+        :return str: Arabic string of the current Hijri date in the location timezone
+        """
+        return self.formatted(datetime.datetime.now(tz=self.timezone).date())
+
+    def to_hijri(self, date: datetime.date):
+        """
+        :param datetime.date date: gregorian date to convert
+        :return hijridate.Hijri: the corresponding Hijri date (looked up from the yearly table)
+        """
+        return self.year_table(date.year)[date.timetuple().tm_yday - 1][1]
+
+    def year_table(self, year: int) -> list:
+        """method to get the Hijri dates of every day in the given gregorian year
+
+        :param int year: gregorian year
+        :return list[tuple[datetime.date, hijridate.Hijri]]: (gregorian date, hijri date) pairs
+        """
+        table = self._year_tables.get(year)
+        if table is None:
+            import hijridate as hj
+
+            start = datetime.date(year, 1, 1)
+            days = (datetime.date(year + 1, 1, 1) - start).days
+            table = []
+            for day in range(days):
+                date = start + datetime.timedelta(days=day)
+                table.append(
+                    (date, hj.Gregorian(date.year, date.month, date.day).to_hijri()))
+            self._year_tables[year] = table
+
+        return table
+
+    def month_table(self, year: int, month: int) -> list:
+        """method to get the Hijri dates of every day in the given gregorian month
+
+        :param int year: gregorian year
+        :param int month: gregorian month
+        :return list[tuple[datetime.date, hijridate.Hijri]]: (gregorian date, hijri date) pairs
+        """
+        start = datetime.date(year, month, 1).timetuple().tm_yday - 1
+        end = (datetime.date(year + month // 12, month % 12 + 1, 1)
+               - datetime.timedelta(days=1)).timetuple().tm_yday
+        return self.year_table(year)[start:end]
@@ -0,0 +1,226 @@
+"""
+module for the local query server of the running app, status bars & scripts connect to its unix
+domain socket & send one command per line, each command is answered with one line of json built
+from the prayer times the app already calculated, e.g.
+
+    echo next | socat - UNIX-CONNECT:$XDG_RUNTIME_DIR/athany.sock
+"""
+import os
+import sys
+import json
+import time
+import socket
+import datetime
+import selectors
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+SOCKET_NAME = "athany.sock"
+
+# commands of the query protocol, an empty line is answered as "status"
+COMMANDS = ("status", "next", "times", "stop")
+# window event sent by the "stop" command, handled like the stop athan button
+STOP_ATHAN_EVENT = "-STOP-ATHAN-"
+MAX_REQUEST = 1024  # longest accepted command line, longer requests close the connection
+RECV_SIZE = 4096
+
+
+def supported() -> bool:
+    """
+    :return bool: whether unix domain sockets are available on this platform
+    """
+    return sys.platform != "win32" and hasattr(socket, "AF_UNIX")
+
+
+def socket_path() -> str:
+    """
+    :return str: path of the query socket, in the user runtime directory if there is one
+    """
+    return os.path.join(os.environ.get("XDG_RUNTIME_DIR") or DATA_DIR, SOCKET_NAME)
+
+
+def in_use(path: str) -> bool:
+    """
+    :param str path: path of a unix domain socket
+    :return bool: whether another process is listening on the socket
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        return False
+    finally:
+        client.close()
+    return True
+
+
+class QueryServer:
+    """class that answers queries on a unix domain socket from a listener thread,
+    the connections are non-blocking & multiplexed with a selector so a slow client
+    can't hold up the others, queries only read the state of the prayer times object"""
+
+    def __init__(self, parent, window, path: str = None):
+        self.parent = parent
+        self.window = window
+        self.path = path or socket_path()
+        self.served = 0
+        self._thread = None
+        self._selector = None
+        self._listener = None
+        self._wakeup = None  # (read end, write end) of the socket pair that stops the thread
+        self._times = (None, None)  # last encoded current_furood dict
+
+    @property
+    def active(self) -> bool:
+        """
+        :return bool: whether the listener thread is running
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """method to start listening on the query socket
+
+        :return bool: False if the platform has no unix domain sockets or another app is listening
+        """
+        if not supported() or self.active:
+            return False
+        if in_use(self.path):
+            print(f"[DEBUG] Query socket is used by another process: {self.path}")
+            return False
+
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if os.path.exists(self.path):  # left behind by an app that didn't exit cleanly
+                os.unlink(self.path)
+            self._listener.bind(self.path)
+            os.chmod(self.path, 0o600)
+            self._listener.listen(8)
+        except OSError as error:
+            print(f"[DEBUG] Couldn't start the query server: {error}")
+            self._listener.close()
+            return False
+
+        self._listener.setblocking(False)
+        self._wakeup = socket.socketpair()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wakeup[0], selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._run, name="athany-query-server",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def close(self):
+        """method to stop the listener thread & remove the query socket"""
+        if not self.active:
+            return
+
+        self._wakeup[1].send(b"\0")
+        self._thread.join(timeout=1)
+
+    # ---------------------------- listener thread --------------------------- #
+
+    def _run(self):
+        try:
+            while True:
+                for key, _ in self._selector.select():
+                    if key.fileobj is self._wakeup[0]:
+                        return
+                    if key.fileobj is self._listener:
+                        self._accept()
+                    else:
+                        self._read(key.fileobj, key.data)
+        finally:
+            self._shutdown()
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            connection.setblocking(False)
+            self._selector.register(connection, selectors.EVENT_READ, bytearray())
+
+    def _read(self, connection, buffer: bytearray):
+        try:
+            data = connection.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+
+        buffer += data
+        try:
+            while b"\n" in buffer:
+                line, _, rest = bytes(buffer).partition(b"\n")
+                buffer[:] = rest
+                connection.sendall(self.answer(line.decode("utf-8", "replace").strip()))
+            if not data and buffer:  # last command without a trailing newline
+                connection.sendall(self.answer(buffer.decode("utf-8", "replace").strip()))
+        except OSError:
+            data = b""
+
+        if not data or len(buffer) > MAX_REQUEST:
+            self._selector.unregister(connection)
+            connection.close()
+
+    def _shutdown(self):
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()
+        self._selector.close()
+        self._wakeup[1].close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    # -------------------------------- queries ------------------------------- #
+
+    def answer(self, command: str) -> bytes:
+        """method to answer one command of the query protocol
+
+        :param str command: one of COMMANDS, an empty command is answered as "status"
+        :return bytes: json reply terminated by a newline
+        """
+        self.served += 1
+        command = command.lower() or "status"
+        if command == "next":
+            reply = self.next_prayer()
+        elif command == "times":
+            return self.times() + b"\n"
+        elif command == "status":
+            pt = self.parent.pt
+            reply = json.dumps({"current": pt.current_fard[0], "next": self.next_prayer(),
+                                "muted": bool(self.parent.settings["-mute-athan-"])}).encode()
+            # the cached times json is spliced in as the last member of the reply
+            return reply[:-1] + b', "times": ' + self.times() + b"}\n"
+        elif command == "stop":
+            self.window.write_event_value(STOP_ATHAN_EVENT, None)
+            reply = {"ok": True}
+        else:
+            reply = {"error": f"unknown command: {command}", "commands": COMMANDS}
+
+        return json.dumps(reply).encode() + b"\n"
+
+    def next_prayer(self) -> dict:
+        """
+        :return dict: the upcoming prayer, its time & the remaining seconds till it
+        """
+        name, prayer_time = self.parent.pt.upcoming_fard
+        epoch = int(prayer_time.timestamp())
+        remaining = max(epoch - int(time.time()), 0)
+        return {"prayer": name, "time": prayer_time.isoformat(), "epoch": epoch,
+                "remaining": remaining, "countdown": str(datetime.timedelta(seconds=remaining))}
+
+    def times(self) -> bytes:
+        """
+        :return bytes: json of the displayed prayer times (tomorrow's after isha),
+        only encoded again when the prayer times object replaces its current_furood dict
+        """
+        furood = self.parent.pt.current_furood
+        if self._times[0] is not furood:
+            self._times = (furood, json.dumps({prayer: prayer_time.isoformat()
+                                               for prayer, prayer_time in furood.items()}).encode())
+        return self._times[1]
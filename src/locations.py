@@ -0,0 +1,130 @@
+"""
+module for monitoring the prayer times of other locations alongside the main one,
+the upcoming prayer of every location is kept in one min-heap so that only the
+earliest of them is checked when the event loop wakes up
+"""
+import heapq
+import datetime
+from zoneinfo import ZoneInfo
+
+from src.timetable import PRAYERS, Timetable, calculation_key, available_backend
+
+# sunrise isn't a prayer, it's only shown for the main location
+MONITORED_PRAYERS = tuple(prayer for prayer in PRAYERS if prayer != "Sunrise")
+
+
+class MonitoredLocation:
+    """class that looks up the upcoming prayer of one location from its own timetable"""
+
+    def __init__(self, city: str, country: str, coords, timezone: str, timetable: Timetable):
+        self.city = city
+        self.country = country
+        self.coords = coords
+        self.timezone = ZoneInfo(timezone)
+        self.timetable = timetable
+        self.upcoming = None  # (prayer name, epoch seconds)
+
+    @property
+    def name(self) -> str:
+        """
+        :return str: display name of the location
+        """
+        return f"{self.city}, {self.country}"
+
+    def next_prayer(self, after: float) -> tuple:
+        """method to get the first prayer of the location after the given time
+
+        :param float after: epoch time
+        :return tuple[str, int]: prayer name & its epoch time
+        """
+        date = datetime.datetime.fromtimestamp(after, tz=self.timezone).date()
+        while True:
+            for prayer, time in zip(PRAYERS, self.timetable.times(date)):
+                if prayer in MONITORED_PRAYERS and time > after:
+                    return prayer, time
+            date += datetime.timedelta(days=1)
+
+    def upcoming_local_time(self) -> datetime.datetime:
+        """
+        :return datetime.datetime: time of the upcoming prayer in the timezone of the location
+        """
+        return datetime.datetime.fromtimestamp(self.upcoming[1], tz=self.timezone)
+
+
+class LocationMonitor:
+    """class that tracks the upcoming prayer of any number of locations,
+    checking for due prayers costs O(1) & each prayer that comes costs O(log n)"""
+
+    def __init__(self):
+        self.locations = []
+        self._heap = []  # (epoch seconds of the upcoming prayer, location index)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __iter__(self):
+        return iter(self.locations)
+
+    def add(self, location: MonitoredLocation, now: float):
+        """method to start monitoring the given location
+
+        :param MonitoredLocation location: location to monitor
+        :param float now: current epoch time
+        """
+        location.upcoming = location.next_prayer(now)
+        self.locations.append(location)
+        heapq.heappush(self._heap, (location.upcoming[1], len(self.locations) - 1))
+
+    def remove(self, index: int):
+        """method to stop monitoring the location at the given index
+
+        :param int index: index of the location in the order they were added
+        """
+        self.locations.pop(index).timetable.close()
+        self._heap = [(location.upcoming[1], position)
+                      for position, location in enumerate(self.locations)]
+        heapq.heapify(self._heap)
+
+    def next_deadline(self):
+        """
+        :return float: epoch time of the earliest upcoming prayer or None if no location is monitored
+        """
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> list:
+        """method to advance the locations whose upcoming prayer came to their next prayer
+
+        :param float now: current epoch time
+        :return list[tuple[MonitoredLocation, str]]: locations & the prayers that came, in time order
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            time, index = heapq.heappop(self._heap)
+            location = self.locations[index]
+            due.append((location, location.upcoming[0]))
+            location.upcoming = location.next_prayer(max(time, now))
+            heapq.heappush(self._heap, (location.upcoming[1], index))
+
+        return due
+
+    def close(self):
+        """method to unmap the timetables of all monitored locations & stop monitoring them"""
+        for location in self.locations:
+            location.timetable.close()
+        self.locations.clear()
+        self._heap.clear()
+
+
+def monitored_location(entry: dict, params, backend: str = "adhanpy") -> MonitoredLocation:
+    """function to create a monitored location from its settings entry
+
+    :param dict entry: location settings entry (-city-, -country-, -coordinates-, -timezone-, -method-)
+    :param CalculationParameters params: calculation parameters of the location method
+    :param str backend: name of the preferred calculation backend
+    :return MonitoredLocation: location with its timetable
+    """
+    backend = available_backend(backend)
+    coords = tuple(entry["-coordinates-"])
+    key = calculation_key(coords, entry["-timezone-"], entry["-method-"], [0, 0], backend)
+    return MonitoredLocation(entry["-city-"], entry["-country-"], coords, entry["-timezone-"],
+                             Timetable(coords, key, params, backend))
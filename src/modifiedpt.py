@@ -1,25 +1,27 @@
 """modified version of PrayerTimes class that contains
-all calculation methods & furood-related attributes
+all calculation methods & furood-related attributes,
+prayer times are looked up from precomputed yearly timetables
 """
 import datetime
 from zoneinfo import ZoneInfo
 
-from adhanpy.PrayerTimes import PrayerTimes
-from adhanpy.calculation.PrayerAdjustments import PrayerAdjustments
 from adhanpy.calculation import CalculationMethod, CalculationParameters
 from adhanpy.calculation.MethodsParameters import methods_parameters
+from src.timetable import PRAYERS, Timetable, calculation_key, available_backend
 
 
-class ModifiedPrayerTimes(PrayerTimes):
+class ModifiedPrayerTimes:
     """Class that provides interface for prayer times, furood & calculation methods"""
 
-    def __init__(self, parent, date=datetime.datetime.now()):
+    def __init__(self, parent, date=datetime.datetime.now(), state_file=None):
         self.parent = parent
+        self.state_file = state_file
         self.now = None
         self.update_time()
         self.tomorrow = self.now+datetime.timedelta(days=1)
 
         self.prayer_offsets = None
+        self.timetable = None
         self.update_prayer_offset()
         self.coords = self.parent.settings["-location-"]["-coordinates-"]
         self.calculation_methods = {
@@ -34,8 +36,7 @@ class ModifiedPrayerTimes(PrayerTimes):
             11: (CalculationMethod.SINGAPORE, "Singapore"),
             12: (CalculationMethod.UOIF, "UOIF"),
             99: (CalculationParameters(fajr_angle=self.parent.settings["-custom-angles-"][0],
-                                       isha_angle=self.parent.settings["-custom-angles-"][1],
-                                       adjustments=self.prayer_offsets), "Custom")
+                                       isha_angle=self.parent.settings["-custom-angles-"][1]), "Custom")
         }
         self.current_furood = None
         self.current_fard, self.upcoming_fard = None, None
@@ -57,15 +58,12 @@ class ModifiedPrayerTimes(PrayerTimes):
             tz=ZoneInfo(self.parent.settings["-location-"]["-timezone-"])).replace(microsecond=0)
 
     def update_prayer_offset(self):
-        """method to update the currently used prayer offsets from the settings file"""
-        self.prayer_offsets = PrayerAdjustments(
-            self.parent.settings["-offset-"]["-Fajr-"],
-            self.parent.settings["-offset-"]["-Sunrise-"],
-            self.parent.settings["-offset-"]["-Dhuhr-"],
-            self.parent.settings["-offset-"]["-Asr-"],
-            self.parent.settings["-offset-"]["-Maghrib-"],
-            self.parent.settings["-offset-"]["-Isha-"]
-        )
+        """method to update the currently used prayer offsets from the settings file,
+        the offsets are applied to the times of the current timetable without recalculating it"""
+        self.prayer_offsets = [self.parent.settings["-offset-"][f"-{prayer}-"]
+                               for prayer in PRAYERS]
+        if self.timetable is not None:
+            self.timetable.set_offsets(self.prayer_offsets)
 
     def prayer_time_came(self):
         """method to check whether next prayer time came & notify the user if that's the case
@@ -74,28 +72,67 @@ class ModifiedPrayerTimes(PrayerTimes):
         """
         return self.now >= self.upcoming_fard[1]
 
-    def update_current_furood(self, date: datetime.datetime):
-        """method to update the current_furood attribute with prayer times of the given date
+    def calculation_parameters(self) -> CalculationParameters:
+        """method to get the calculation parameters of the currently used method,
+        prayer offsets aren't included as they're applied by the timetable
 
-        :param datetime.datetime date: date to get pt for
+        :return CalculationParameters: parameters used to calculate prayer times
         """
         if self.parent.settings["-used-method-"] == 99:
-            params: CalculationParameters = self.calculation_methods[99][0]
-            params.method = None
-            params.fajr_angle = self.parent.settings["-custom-angles-"][0]
-            params.isha_angle = self.parent.settings["-custom-angles-"][1]
+            params = CalculationParameters(fajr_angle=self.parent.settings["-custom-angles-"][0],
+                                           isha_angle=self.parent.settings["-custom-angles-"][1])
         else:
             method: CalculationMethod = \
                 self.calculation_methods[self.parent.settings["-used-method-"]][0]
-            params = CalculationParameters(method,
-                                           adjustments=self.prayer_offsets)
+            params = CalculationParameters(method)
 
-        super().__init__(self.coords, date,
-                         calculation_parameters=params,
-                         time_zone=ZoneInfo(self.parent.settings["-location-"]["-timezone-"]))
+        return params
 
-        self.current_furood = {name: getattr(self, name.lower())
-                               for name in self.parent.displayed_times}
+    def method_parameters(self, method_id: int) -> CalculationParameters:
+        """method to get the calculation parameters of one of the standard methods
+        (e.g. the default method of another monitored location)
+
+        :param int method_id: method id as in the calculation_methods dictionary
+        :return CalculationParameters: parameters of the method, Umm Al-Qura if it's unknown
+        """
+        method = self.calculation_methods.get(method_id, self.calculation_methods[4])[0]
+        if isinstance(method, CalculationParameters):
+            return method
+        return CalculationParameters(method)
+
+    def get_timetable(self) -> Timetable:
+        """method to get the timetable of the current calculation settings,
+        a new timetable is used whenever location, method or angles change
+
+        :return Timetable: timetable matching the current calculation settings
+        """
+        backend = available_backend(
+            self.parent.settings["-calculation-backend-"])
+        key = calculation_key(self.coords,
+                              self.parent.settings["-location-"]["-timezone-"],
+                              self.parent.settings["-used-method-"],
+                              self.parent.settings["-custom-angles-"],
+                              backend)
+
+        if self.timetable is None or self.timetable.key != key:
+            if self.timetable is not None:
+                self.timetable.close()
+            self.timetable = Timetable(
+                self.coords, key, self.calculation_parameters(), backend)
+            self.timetable.set_offsets(self.prayer_offsets)
+
+        return self.timetable
+
+    def update_current_furood(self, date: datetime.datetime):
+        """method to update the current_furood attribute with prayer times of the given date
+
+        :param datetime.datetime date: date to get pt for
+        """
+        time_zone = ZoneInfo(self.parent.settings["-location-"]["-timezone-"])
+        times = self.get_timetable().times(date.date())
+
+        self.current_furood = {name: datetime.datetime.fromtimestamp(time, tz=time_zone)
+                               for name, time in zip(self.parent.displayed_times, times)}
 
     def update_current_and_next_prayer(self):
         """function to set the current & next fard from the furood dict & update the dict used if Isha passed
@@ -136,8 +173,25 @@ class ModifiedPrayerTimes(PrayerTimes):
             self.current_fard = ("Isha", self.current_furood["Isha"])
             self.upcoming_fard = ("Fajr", self.current_furood["Fajr"])
 
+        self.publish_state()
         return isha_passed
 
+    def publish_state(self):
+        """method to write the displayed prayer times, the ones of the day after them
+        & the current/upcoming fard to the state file (if the app keeps one)"""
+        if self.state_file is None:
+            return
+
+        date = self.current_furood["Fajr"].date()
+        times = list(self.get_timetable().times(date))
+        next_times = self.get_timetable().times(date + datetime.timedelta(days=1))
+        time_zone = self.current_furood["Fajr"].tzinfo
+        utc_offsets = [int(datetime.datetime.fromtimestamp(day[0], tz=time_zone).utcoffset().total_seconds())
+                       for day in (times, next_times)]
+        self.state_file.publish(times + list(next_times), utc_offsets,
+                                PRAYERS.index(self.current_fard[0]),
+                                PRAYERS.index(self.upcoming_fard[0]))
+
     def get_method_id(self, method_name: str):
         """method to set the id of the given calculation method name in the settings file
 
@@ -0,0 +1,127 @@
+"""
+module for the shared HTTP session used by every network request of the application
+"""
+import functools
+import concurrent.futures
+from urllib.parse import urlsplit
+
+# (connect, read) timeouts in seconds & number of retries for each host,
+# connect timeouts are slightly above a multiple of 3 s (the TCP retransmission window)
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_RETRIES = 2
+HOSTS = {
+    "ipinfo.io": ((3.05, 4), 0),
+    "api.ipgeolocation.io": ((3.05, 4), 0),
+    "api.aladhan.com": ((3.05, 5), 2),
+    "github.com": ((3.05, 10), 2),
+    "raw.githubusercontent.com": ((3.05, 10), 2),
+}
+RETRY_BACKOFF = 0.3  # sleeps 0.3 s, 0.6 s, ... between retries
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_SIZE = 4
+
+# geolocation providers are raced, racing already covers a failing provider so they are not retried
+LOCATION_DEADLINE = 5
+GEOLOCATION_PROVIDERS = (
+    ("https://ipinfo.io/json",
+     lambda data: (data["city"], data["country"])),
+    ("https://api.ipgeolocation.io/ipgeo?apiKey=397b014528ba421cafcc5df4d00c9e9a",
+     lambda data: (data["city"], data["country_code2"])),
+)
+
+
+def _adapter(retries: int):
+    """
+    :param int retries: number of retries for failed connections & retryable statuses
+    :return requests.adapters.HTTPAdapter: pooled adapter retrying with exponential backoff
+    """
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # raise_on_status=False returns the last response so callers keep checking status codes
+    retry = Retry(total=retries, backoff_factor=RETRY_BACKOFF,
+                  status_forcelist=RETRY_STATUSES, allowed_methods=("GET", "HEAD"),
+                  raise_on_status=False)
+    return HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                       max_retries=retry)
+
+
+@functools.lru_cache(maxsize=None)
+def get_session():
+    """
+    :return requests.Session: the shared keep-alive session, created on first use
+    """
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "athany"
+    session.mount("http://", _adapter(DEFAULT_RETRIES))
+    session.mount("https://", _adapter(DEFAULT_RETRIES))
+    for host, (_, retries) in HOSTS.items():
+        if retries != DEFAULT_RETRIES:
+            session.mount(f"http://{host}", _adapter(retries))
+            session.mount(f"https://{host}", _adapter(retries))
+
+    return session
+
+
+def timeout_for(url: str) -> tuple:
+    """
+    :param str url: url of the request
+    :return tuple[float, float]: (connect, read) timeouts of the url host
+    """
+    host = urlsplit(url.strip()).hostname
+    return HOSTS[host][0] if host in HOSTS else DEFAULT_TIMEOUT
+
+
+def get(url: str, **kwargs):
+    """function to send a GET request using the shared session & the host timeouts
+
+    :param str url: url to request
+    :return requests.Response: the response of the last attempt
+    """
+    kwargs.setdefault("timeout", timeout_for(url))
+    return get_session().get(url.strip(), **kwargs)
+
+
+def _locate(url: str, parse) -> tuple:
+    """
+    :param str url: geolocation provider url
+    :param callable parse: function extracting (city, country code) from the json response
+    :return tuple[str, str]: city & country code of the current IP or None if the provider failed
+    """
+    import requests
+
+    try:
+        res = get(url)
+        if res.status_code != 200:
+            return None
+        city, country = parse(res.json())
+    except (requests.exceptions.RequestException, ValueError, KeyError, TypeError):
+        return None
+
+    return (city, country) if city and country else None
+
+
+def locate():
+    """function to get the city & country of the current IP by querying the
+    geolocation providers concurrently, the first valid answer wins
+
+    :return tuple[str, str]: city & country code or None if no provider answered in time
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=len(GEOLOCATION_PROVIDERS), thread_name_prefix="geolocation")
+    futures = [executor.submit(_locate, url, parse)
+               for url, parse in GEOLOCATION_PROVIDERS]
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=LOCATION_DEADLINE):
+            location = future.result()
+            if location is not None:
+                return location
+    except concurrent.futures.TimeoutError:
+        pass
+    finally:
+        # requests already in flight can't be interrupted, they end within their timeout
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return None
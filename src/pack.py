@@ -0,0 +1,120 @@
+"""
+module for reading the bundled athans pack, a single indexed file holding every recitation once,
+the takbeer-only athans are played from the start of their full recording up to a stored cut point
+"""
+import os
+import mmap
+import struct
+import functools
+from collections import namedtuple
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+PACK_FILE = os.path.join(DATA_DIR, "athans.pack")
+
+# file layout (all integers little-endian):
+#   header
+#   entries      ENTRY + utf-8 filename, one per athan of the catalog
+#   padding      up to the next BLOCK_SIZE boundary
+#   blobs        encoded recordings (Ogg Vorbis or MP3), each aligned to BLOCK_SIZE,
+#                the entries of a recitation & its takbeer-only athan share one blob
+MAGIC = b"ATPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")  # magic, version, entry count
+# blob offset, blob length, sample rate, frames to play (0 for the whole recording),
+# channels, codec index, filename length
+ENTRY = struct.Struct("<QIIIBBH")
+CODECS = ("mp3", "ogg")
+BLOCK_SIZE = 4096
+
+# paths of packed athans are passed around (e.g. to the audio player process) as "pack:<filename>"
+REF_PREFIX = "pack:"
+
+PackEntry = namedtuple("PackEntry", "offset length rate channels codec frames")
+
+
+def ref(filename: str) -> str:
+    """
+    :param str filename: athan filename (e.g. "Abdul-Basit_(Takbeer_only).mp3")
+    :return str: path of the packed athan
+    """
+    return REF_PREFIX + filename
+
+
+def parse_ref(path: str):
+    """
+    :param str path: path of an audio file or a packed athan
+    :return str: filename of the packed athan or None if the path isn't a pack reference
+    """
+    return path[len(REF_PREFIX):] if path.startswith(REF_PREFIX) else None
+
+
+class AthanPack:
+    """class that maps the athans pack into memory, only the index is read on load,
+    the pages of a recording are read from disk when it's decoded"""
+
+    def __init__(self, filename: str = PACK_FILE):
+        self.filename = filename
+        with open(filename, "rb") as pack_file:
+            self._data = mmap.mmap(pack_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+            stat = os.fstat(pack_file.fileno())
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+
+        magic, version, count = HEADER.unpack_from(self._data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"invalid athans pack: {filename}")
+
+        self.entries = {}
+        position = HEADER.size
+        for _ in range(count):
+            offset, length, rate, frames, channels, codec, name_size = ENTRY.unpack_from(
+                self._data, position)
+            position += ENTRY.size
+            name = self._data[position:position + name_size].decode("utf-8")
+            position += name_size
+            if offset + length > len(self._data):
+                raise ValueError(f"truncated athans pack: {filename}")
+            self.entries[name] = PackEntry(offset, length, rate, channels, CODECS[codec], frames)
+
+    def __contains__(self, filename: str):
+        return filename in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, filename: str):
+        """
+        :param str filename: athan filename
+        :return PackEntry: location & format of the packed athan or None if it's not in the pack
+        """
+        return self.entries.get(filename)
+
+    def full_recording(self, entry: PackEntry):
+        """
+        :param PackEntry entry: packed athan (e.g. a takbeer-only athan)
+        :return str: filename of the athan that plays the whole recording of the entry
+        or None if there is none
+        """
+        for name, other in self.entries.items():
+            if other.offset == entry.offset and not other.frames:
+                return name
+        return None
+
+    def data(self, entry: PackEntry) -> bytes:
+        """
+        :param PackEntry entry: packed athan
+        :return bytes: encoded recording of the athan
+        """
+        return self._data[entry.offset:entry.offset + entry.length]
+
+
+@functools.lru_cache(maxsize=None)
+def get_pack():
+    """
+    :return AthanPack: the bundled athans pack or None if it's missing or invalid
+    """
+    try:
+        return AthanPack()
+    except (OSError, ValueError, IndexError, struct.error):
+        return None
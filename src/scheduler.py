@@ -0,0 +1,102 @@
+"""
+module for scheduling the main window updates on real deadlines instead of polling
+"""
+import math
+import heapq
+import datetime
+
+
+class Scheduler:
+    """class that keeps a min-heap of named deadlines (epoch seconds)
+    & tells the event loop how long it can block until the earliest one is due"""
+
+    def __init__(self):
+        self._heap = []
+        self._deadlines = {}
+
+    def schedule(self, name: str, when: float):
+        """method to (re)schedule the named timer, replacing any previous deadline it had
+
+        :param str name: name of the timer
+        :param float when: epoch time (in seconds) when the timer is due
+        """
+        self._deadlines[name] = when
+        heapq.heappush(self._heap, (when, name))
+
+    def cancel(self, name: str):
+        """method to remove the named timer from the scheduler if it exists
+
+        :param str name: name of the timer
+        """
+        self._deadlines.pop(name, None)
+
+    def _discard_stale(self):
+        """remove heap entries of timers that were cancelled or rescheduled"""
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def next_deadline(self):
+        """
+        :return float: epoch time of the earliest scheduled timer or None if there are no timers
+        """
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def timeout_ms(self, now: float, maximum: int = None):
+        """method to get the time the event loop can block until the next deadline
+
+        :param float now: current epoch time
+        :param int maximum: upper bound for the returned timeout
+        :return int: milliseconds until the next deadline (None means block indefinitely)
+        """
+        deadline = self.next_deadline()
+        if deadline is None:
+            return maximum
+
+        # round up, waking up a fraction of a ms early would only make the loop spin
+        timeout = max(0, math.ceil((deadline - now) * 1000))
+        return timeout if maximum is None else min(timeout, maximum)
+
+    def pop_due(self, now: float):
+        """method to remove all timers that are due from the scheduler
+
+        :param float now: current epoch time
+        :return list[str]: names of the due timers in deadline order
+        """
+        due = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+
+            _, name = heapq.heappop(self._heap)
+            del self._deadlines[name]
+            due.append(name)
+
+        return due
+
+
+def next_second(now: float) -> float:
+    """
+    :param float now: current epoch time
+    :return float: epoch time of the next whole second
+    """
+    return math.floor(now) + 1
+
+
+def next_minute(now: float) -> float:
+    """
+    :param float now: current epoch time
+    :return float: epoch time of the next whole minute
+    """
+    return (math.floor(now) // 60 + 1) * 60
+
+
+def next_midnight(now: datetime.datetime) -> float:
+    """
+    :param datetime.datetime now: timezone-aware current time
+    :return float: epoch time of the next local midnight in the timezone of the given time
+    """
+    tomorrow = now.date() + datetime.timedelta(days=1)
+    return datetime.datetime(tomorrow.year, tomorrow.month, tomorrow.day,
+                             tzinfo=now.tzinfo).timestamp()
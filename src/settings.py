@@ -0,0 +1,109 @@
+"""
+module for reading & writing the application settings file
+"""
+import os
+import json
+import atexit
+import weakref
+import threading
+
+# stores with changes that may still be pending, flushed once at exit
+# (a weak set so that exiting doesn't keep every store ever created alive)
+_stores = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for store in list(_stores):
+        store.flush()
+
+
+class SettingsStore:
+    """A write-behind replacement of PySimpleGUI.UserSettings that keeps the settings in memory,
+    batches changes into one debounced write & writes the file atomically.
+    The file format is the same json file written by PySimpleGUI.UserSettings"""
+
+    def __init__(self, filename: str, path: str, write_delay: float = 1.0, read_only: bool = False):
+        self.full_filename = os.path.join(path, filename)
+        self.write_delay = write_delay
+        self.read_only = read_only
+        self.dict = self.load()
+
+        self._lock = threading.RLock()
+        self._timer = None
+        _stores.add(self)
+
+    def load(self) -> dict:
+        """method to read the settings file from disk
+
+        :return dict: saved settings, empty if the file doesn't exist or is corrupted
+        """
+        try:
+            with open(self.full_filename, encoding="utf-8") as settings_file:
+                settings = json.load(settings_file)
+        except (OSError, ValueError):
+            return {}
+
+        return settings if isinstance(settings, dict) else {}
+
+    def get(self, key, default=None):
+        """
+        :param str key: settings entry key
+        :param default: value returned if the entry doesn't exist
+        :return: value of the settings entry
+        """
+        return self.dict.get(key, default)
+
+    def __getitem__(self, key):
+        return self.dict.get(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self.dict[key] = value
+        self.save()
+
+    def delete_entry(self, key):
+        """method to delete the given entry from the settings
+
+        :param str key: settings entry key
+        """
+        with self._lock:
+            self.dict.pop(key, None)
+        self.save()
+
+    def save(self):
+        """method to schedule writing the settings to disk,
+        changes made before the write delay passes are written together"""
+        if self.read_only:
+            return
+
+        with self._lock:
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """method to write any pending changes to disk immediately"""
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+
+            try:
+                data = json.dumps(self.dict)
+            except RuntimeError:  # a nested entry is being modified, try again later
+                self.save()
+                return
+
+            tmp_filename = self.full_filename + ".tmp"
+            try:
+                with open(tmp_filename, "w", encoding="utf-8") as settings_file:
+                    settings_file.write(data)
+                    settings_file.flush()
+                    os.fsync(settings_file.fileno())
+                os.replace(tmp_filename, self.full_filename)
+            except OSError as error:  # e.g. a full disk, the changes stay pending & are retried
+                print(f"[DEBUG] Couldn't save the settings: {error}")
+                self.save()
@@ -0,0 +1,303 @@
+"""
+vectorized version of the adhanpy solar position & prayer times calculation,
+computes the prayer times of N dates x M locations in one pass using NumPy arrays
+"""
+import calendar
+import datetime
+
+import numpy as np
+from adhanpy.calculation import CalculationMethod, CalculationParameters
+
+# julian day of 0001-01-01 00:00 UTC minus its proleptic gregorian ordinal
+JULIAN_DAY_OFFSET = 1721424.5
+UNIX_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+SOLAR_ALTITUDE = -50.0 / 60.0
+
+
+# ---------------------------- astronomical helpers ---------------------------- #
+
+def unwind_angle(value):
+    """normalize angles to the range [0, 360)"""
+    return value - 360 * np.floor(value / 360)
+
+
+def closest_angle(angle):
+    """normalize angles to the range [-180, 180]"""
+    return np.where((angle >= -180) & (angle <= 180), angle, angle - 360 * np.round(angle / 360))
+
+
+def interpolate(y2, y1, y3, n):
+    """Astronomical Algorithms page 24"""
+    a = y2 - y1
+    b = y3 - y2
+    return y2 + (n / 2) * (a + b + n * (b - a))
+
+
+def interpolate_angles(y2, y1, y3, n):
+    """Astronomical Algorithms page 24"""
+    a = unwind_angle(y2 - y1)
+    b = unwind_angle(y3 - y2)
+    return y2 + (n / 2) * (a + b + n * (b - a))
+
+
+def solar_coordinates(julian_day):
+    """function to get the solar coordinates of the given julian days
+
+    :param np.ndarray julian_day: julian days to get the coordinates for
+    :return tuple[np.ndarray]: declination, right ascension & apparent sidereal time in degrees
+    """
+    T = (julian_day - 2451545.0) / 36525
+    L0 = unwind_angle(280.4664567 + 36000.76983 * T + 0.0003032 * T**2)
+    Lp = unwind_angle(218.3165 + 481267.8813 * T)
+    omega = unwind_angle(125.04452 - 1934.136261 * T +
+                         0.0020708 * T**2 + T**3 / 450000)
+
+    # apparent solar longitude
+    M = np.radians(unwind_angle(35999.05029 * T + 357.52911 - 0.0001537 * T**2))
+    center = (1.914602 - 0.004817 * T - 0.000014 * T**2) * np.sin(M) \
+        + (0.019993 - 0.000101 * T) * np.sin(2 * M) + 0.000289 * np.sin(3 * M)
+    apparent_omega = 125.04 - 1934.136 * T
+    lamda = np.radians(unwind_angle(
+        L0 + center - 0.00569 - 0.00478 * np.sin(np.radians(apparent_omega))))
+
+    # mean sidereal time
+    theta0 = unwind_angle(280.46061837 + 360.98564736629 * (T * 36525)
+                          + 0.000387933 * T**2 - T**3 / 38710000)
+
+    # nutation in longitude & obliquity
+    delta_psi = (-17.2 / 3600) * np.sin(np.radians(omega)) \
+        - (1.32 / 3600) * np.sin(2 * np.radians(L0)) \
+        - (0.23 / 3600) * np.sin(2 * np.radians(Lp)) \
+        + (0.21 / 3600) * np.sin(2 * np.radians(omega))
+    delta_epsilon = (9.2 / 3600) * np.cos(np.radians(omega)) \
+        + (0.57 / 3600) * np.cos(2 * np.radians(L0)) \
+        + (0.10 / 3600) * np.cos(2 * np.radians(Lp)) \
+        - (0.09 / 3600) * np.cos(2 * np.radians(omega))
+
+    epsilon0 = 23.439291 - 0.013004167 * T - \
+        0.0000001639 * T**2 + 0.0000005036 * T**3
+    epsilon_app = np.radians(
+        epsilon0 + 0.00256 * np.cos(np.radians(apparent_omega)))
+
+    declination = np.degrees(np.arcsin(np.sin(epsilon_app) * np.sin(lamda)))
+    right_ascension = unwind_angle(np.degrees(np.arctan2(
+        np.cos(epsilon_app) * np.sin(lamda), np.cos(lamda))))
+    sidereal_time = theta0 + \
+        delta_psi * np.cos(np.radians(epsilon0 + delta_epsilon))
+
+    return declination, right_ascension, sidereal_time
+
+
+class SolarTime:
+    """vectorized version of adhanpy SolarTime, date arrays have shape (N, 1)
+    & location arrays have shape (1, M) so every result is broadcast to (N, M)"""
+
+    def __init__(self, julian_days, latitude, longitude):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.prev_solar = solar_coordinates(julian_days - 1)
+        self.solar = solar_coordinates(julian_days)
+        self.next_solar = solar_coordinates(julian_days + 1)
+
+        declination, right_ascension, sidereal_time = self.solar
+        self.approximate_transit = unwind_angle(
+            right_ascension - longitude - sidereal_time) / 360
+
+        # corrected transit
+        theta = unwind_angle(
+            sidereal_time + 360.985647 * self.approximate_transit)
+        alpha = unwind_angle(interpolate_angles(
+            right_ascension, self.prev_solar[1], self.next_solar[1], self.approximate_transit))
+        hour_angle = closest_angle(theta + longitude - alpha)
+        self.transit = (self.approximate_transit - hour_angle / 360) * 24
+
+        self.sunrise = self.hour_angle(SOLAR_ALTITUDE, False)
+        self.sunset = self.hour_angle(SOLAR_ALTITUDE, True)
+        self.declination = declination
+
+    def hour_angle(self, angle, after_transit: bool):
+        """corrected hour angle, Astronomical Algorithms page 102
+
+        :param angle: altitude of the sun in degrees
+        :param bool after_transit: whether the time is after or before the transit
+        :return np.ndarray: UTC hours of the day (nan where the sun never reaches the altitude)
+        """
+        lat = np.radians(self.latitude)
+        declination, right_ascension, sidereal_time = self.solar
+        with np.errstate(invalid="ignore", divide="ignore"):
+            H0 = np.degrees(np.arccos(
+                (np.sin(np.radians(angle)) - np.sin(lat) * np.sin(np.radians(declination)))
+                / (np.cos(lat) * np.cos(np.radians(declination)))))
+            m = self.approximate_transit + \
+                (H0 / 360 if after_transit else -H0 / 360)
+
+            theta = unwind_angle(sidereal_time + 360.985647 * m)
+            alpha = unwind_angle(interpolate_angles(
+                right_ascension, self.prev_solar[1], self.next_solar[1], m))
+            delta = np.radians(interpolate(
+                declination, self.prev_solar[0], self.next_solar[0], m))
+            H = np.radians(theta + self.longitude - alpha)
+            altitude = np.degrees(np.arcsin(np.sin(lat) * np.sin(delta)
+                                            + np.cos(lat) * np.cos(delta) * np.cos(H)))
+            delta_m = (altitude - angle) / \
+                (360 * np.cos(delta) * np.cos(lat) * np.sin(H))
+
+        return (m + delta_m) * 24
+
+    def afternoon(self, shadow_length: float):
+        """hours of the day when the shadow of an object equals
+        the given ratio of its length plus its noon shadow (asr)"""
+        tangent = np.abs(self.latitude - self.declination)
+        angle = np.degrees(np.arctan(
+            1.0 / (shadow_length + np.tan(np.radians(tangent)))))
+        return self.hour_angle(angle, True)
+
+
+# --------------------------- seasonal adjustments --------------------------- #
+
+def days_since_solstice(day_of_year, year_days, latitude):
+    """vectorized version of adhanpy days_since_solstice"""
+    northern = day_of_year + 10
+    northern = np.where(northern >= year_days, northern - year_days, northern)
+    southern = day_of_year - np.where(year_days == 366, 173, 172)
+    southern = np.where(southern < 0, southern + year_days, southern)
+    return np.where(latitude >= 0, northern, southern)
+
+
+def season_adjustment(dyy, a, b, c, d):
+    """piecewise linear interpolation of the moonsighting committee seasonal adjustment (minutes)"""
+    return np.select(
+        [dyy < 91, dyy < 137, dyy < 183, dyy < 229, dyy < 275],
+        [a + (b - a) / 91.0 * dyy,
+         b + (c - b) / 46.0 * (dyy - 91),
+         c + (d - c) / 46.0 * (dyy - 137),
+         d + (c - d) / 46.0 * (dyy - 183),
+         c + (b - c) / 46.0 * (dyy - 229)],
+        b + (a - b) / 91.0 * (dyy - 275))
+
+
+def season_adjusted_morning_twilight(latitude, dyy, sunrise):
+    """earliest fajr (epoch seconds) allowed by the moonsighting committee"""
+    lat = np.abs(latitude)
+    adjustment = season_adjustment(dyy, 75 + (28.65 / 55.0) * lat, 75 + (19.44 / 55.0) * lat,
+                                   75 + (32.74 / 55.0) * lat, 75 + (48.10 / 55.0) * lat)
+    return sunrise - np.round(adjustment * 60.0).astype(np.int64)
+
+
+def season_adjusted_evening_twilight(latitude, dyy, sunset):
+    """latest isha (epoch seconds) allowed by the moonsighting committee"""
+    lat = np.abs(latitude)
+    adjustment = season_adjustment(dyy, 75 + (25.60 / 55.0) * lat, 75 + (2.050 / 55.0) * lat,
+                                   75 - (9.210 / 55.0) * lat, 75 + (6.140 / 55.0) * lat)
+    return sunset + np.round(adjustment * 60.0).astype(np.int64)
+
+
+# ------------------------------ prayer times ------------------------------ #
+
+def to_epoch(hours, day_start):
+    """function to convert UTC hours of the day to epoch seconds (dropping fractions of a second)
+
+    :param np.ndarray hours: UTC hours of the day, nan where the time doesn't exist
+    :param np.ndarray day_start: epoch seconds of the start of each day
+    :return tuple[np.ndarray, np.ndarray]: epoch seconds & mask of the times that exist
+    """
+    valid = ~np.isnan(hours)
+    return day_start + np.floor(np.where(valid, hours, 0) * 3600).astype(np.int64), valid
+
+
+def rounded_minute(times):
+    """round epoch seconds to the nearest minute like adhanpy"""
+    seconds = times % 60
+    # adhanpy drops the seconds instead of rounding up when the minute is 59
+    round_up = (seconds > 30) & ((times // 60) % 60 != 59)
+    return times - seconds + 60 * round_up
+
+
+def prayer_times(dates, locations, params: CalculationParameters,
+                 rounded: bool = True) -> np.ndarray:
+    """function to calculate the prayer times of every date at every location
+
+    :param list[datetime.date] dates: N dates to calculate the prayer times for
+    :param list[tuple[float, float]] locations: M (latitude, longitude) pairs
+    :param CalculationParameters params: calculation method parameters
+    :param bool rounded: whether to round the times to the nearest minute like adhanpy
+    :return np.ndarray: int64 array of shape (N, M, 6) containing the epoch seconds
+    of Fajr, Sunrise, Dhuhr, Asr, Maghrib & Isha
+    """
+    ordinals = np.array([date.toordinal() for date in dates], dtype=np.int64)
+    # the solar positions are computed once for every date & the day after it (for the sunrise
+    # that ends its night), consecutive dates share their rows so a year needs one extra day
+    days = np.union1d(ordinals, ordinals + 1)
+    today = np.searchsorted(days, ordinals)
+    tomorrow = np.searchsorted(days, ordinals + 1)
+    days = days[:, np.newaxis]
+    locations = np.asarray(locations, dtype=np.float64).reshape(-1, 2)
+    latitude = locations[:, 0][np.newaxis, :]
+    longitude = locations[:, 1][np.newaxis, :]
+
+    solar_time = SolarTime(days + JULIAN_DAY_OFFSET, latitude, longitude)
+    if np.isnan(solar_time.transit).any() or np.isnan(solar_time.sunrise).any() \
+            or np.isnan(solar_time.sunset).any():
+        raise RuntimeError("the sun doesn't rise or set on some of the dates at these locations")
+
+    day_start = (days - UNIX_EPOCH_ORDINAL) * 86400
+    sunrise_all, _ = to_epoch(solar_time.sunrise, day_start)
+    sunrise, tomorrow_sunrise = sunrise_all[today], sunrise_all[tomorrow]
+    day_start = day_start[today]
+    sunset, _ = to_epoch(solar_time.sunset[today], day_start)
+    transit, _ = to_epoch(solar_time.transit[today], day_start)
+
+    night_length = tomorrow_sunrise - sunset
+    night_portions = params.night_portions()
+    moonsighting = params.method == CalculationMethod.MOON_SIGHTING_COMMITTEE
+    high_latitude = np.broadcast_to(latitude >= 55, sunset.shape)
+    if moonsighting:
+        day_of_year = np.array([date.timetuple().tm_yday for date in dates])
+        year_days = np.array([366 if calendar.isleap(date.year) else 365
+                              for date in dates])
+        dyy = days_since_solstice(day_of_year[:, np.newaxis],
+                                  year_days[:, np.newaxis], latitude)
+
+    # fajr
+    fajr, valid = to_epoch(solar_time.hour_angle(
+        -params.fajr_angle, False)[today], day_start)
+    if moonsighting:
+        fajr = np.where(high_latitude, sunrise - night_length // 7, fajr)
+        valid = valid | high_latitude
+        safe_fajr = season_adjusted_morning_twilight(latitude, dyy, sunrise)
+    else:
+        safe_fajr = sunrise - \
+            np.trunc(night_portions.fajr * night_length).astype(np.int64)
+    fajr = np.where(~valid | (fajr < safe_fajr), safe_fajr, fajr)
+
+    # asr
+    asr, valid = to_epoch(solar_time.afternoon(
+        params.madhab.get_shadow_length().shadow_length)[today], day_start)
+    if not valid.all():
+        raise RuntimeError("the asr time doesn't exist on some of the dates at these locations")
+
+    # isha
+    if params.isha_interval >= 1:
+        isha = sunset + int(params.isha_interval * 60)
+    else:
+        isha, valid = to_epoch(solar_time.hour_angle(
+            -params.isha_angle, True)[today], day_start)
+        if moonsighting:
+            isha = np.where(high_latitude, sunset + night_length // 7, isha)
+            valid = valid | high_latitude
+            safe_isha = season_adjusted_evening_twilight(
+                latitude, dyy, sunset)
+        else:
+            safe_isha = sunset + \
+                np.trunc(night_portions.isha * night_length).astype(np.int64)
+        isha = np.where(~valid | (isha > safe_isha), safe_isha, isha)
+
+    times = []
+    for name, value in zip(("fajr", "sunrise", "dhuhr", "asr", "maghrib", "isha"),
+                           (fajr, sunrise, transit, asr, sunset, isha)):
+        minutes = getattr(params.adjustments, name) + \
+            getattr(params.method_adjustments, name)
+        value = np.broadcast_to(value, (len(dates), locations.shape[0])) + minutes * 60
+        times.append(rounded_minute(value) if rounded else value)
+
+    return np.stack(times, axis=-1)
@@ -0,0 +1,168 @@
+"""
+module for the state file of the running app, a small fixed-layout file holding the prayer times
+of the displayed day & the day after it, so the upcoming prayer & its countdown can be read without
+importing adhanpy, zoneinfo or the settings, run as a script it prints the upcoming prayer:
+
+    python -S src/state.py [--json]
+
+file layout (128 bytes, all integers little-endian):
+
+    offset  size  field
+    0       4     magic "ATST"
+    4       2     version (2)
+    6       1     current prayer, index into PRAYERS (after isha it's the isha of the previous day)
+    7       1     upcoming prayer, index into the times (0-5 displayed day, 6-11 the day after)
+    8       8     generation, incremented on every write
+    16      4     utc offset in seconds of the displayed day
+    20      4     utc offset in seconds of the day after
+    24      4     pid of the app that writes the file
+    28      4     reserved
+    32      96    12 epoch times (int64), Fajr Sunrise Dhuhr Asr Maghrib Isha of both days
+
+the file is replaced atomically, so it never has to be read twice, & removed when the app exits,
+a file left behind by a crash is recognized by its pid, e.g. from a shell:
+
+    kill -0 "$(od -An -t u4 -j 24 -N 4 src/Data/athany.state)" &&
+        od -An -t d8 -j 32 -N 96 -w96 src/Data/athany.state
+"""
+import os
+import sys
+import time
+import struct
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+STATE_FILE = os.path.join(DATA_DIR, "athany.state")
+
+PRAYERS = ("Fajr", "Sunrise", "Dhuhr", "Asr", "Maghrib", "Isha")
+MAGIC = b"ATST"
+VERSION = 2
+# magic, version, current prayer, upcoming index, generation, utc offsets, pid, times
+STATE = struct.Struct(f"<4sHbbQ2iI4x{2 * len(PRAYERS)}q")
+
+
+class StateFile:
+    """class that writes the state of the prayer times to the state file,
+    the file is only replaced when the state changes"""
+
+    def __init__(self, filename: str = STATE_FILE):
+        self.filename = filename
+        self._last = None
+        # keep counting from a file left behind by a crash so readers never see the generation go back
+        state = read_state(filename)
+        self.generation = state[2] if state is not None else 0
+
+    def publish(self, times, utc_offsets, current: int, upcoming: int) -> bool:
+        """method to write the given state if it differs from the last written one
+
+        :param list[int] times: epoch times of the 6 prayers of the displayed day & the day after
+        :param tuple[int, int] utc_offsets: utc offsets in seconds of the 2 days
+        :param int current: index of the current prayer in PRAYERS
+        :param int upcoming: index of the upcoming prayer in the times
+        :return bool: whether the file was written
+        """
+        state = (tuple(times), tuple(utc_offsets), current, upcoming)
+        if state == self._last:
+            return False
+
+        data = STATE.pack(MAGIC, VERSION, current, upcoming, self.generation + 1,
+                          *utc_offsets, os.getpid(), *times)
+        temp_file = self.filename + ".tmp"
+        try:
+            with open(temp_file, "wb") as state_file:
+                state_file.write(data)
+            os.replace(temp_file, self.filename)
+        except OSError as error:
+            print(f"[DEBUG] Couldn't write the state file: {error}")
+            return False
+
+        self.generation += 1
+        self._last = state
+        return True
+
+    def close(self):
+        """method to remove the state file when the app exits, so readers know it isn't running"""
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
+        self._last = None
+
+
+def read_state(filename: str = STATE_FILE):
+    """
+    :param str filename: path of the state file
+    :return tuple: (current prayer, upcoming index, generation, utc offsets, times, pid)
+    or None if the file is missing or invalid
+    """
+    try:
+        with open(filename, "rb") as state_file:
+            data = state_file.read(STATE.size + 1)
+    except OSError:
+        return None
+    if len(data) != STATE.size:
+        return None
+
+    magic, version, current, upcoming, generation, *values = STATE.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return current, upcoming, generation, values[:2], values[3:], values[2]
+
+
+def is_running(pid: int) -> bool:
+    """
+    :param int pid: pid of the app that wrote the state file
+    :return bool: whether the process is still running (always True on windows,
+    where the file is only removed on exit as os.kill would terminate the process)
+    """
+    if sys.platform == "win32":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:  # e.g. a process of another user
+        pass
+    return True
+
+
+def upcoming_prayer(state: tuple, now: float):
+    """function to get the upcoming prayer at the given time, the prayers after the stored
+    upcoming one are used if the app didn't update the file since its time came
+
+    :param tuple state: state read by read_state
+    :param float now: epoch time
+    :return tuple[str, int, int]: prayer name, its epoch time & utc offset
+    or None if all the prayers in the file passed
+    """
+    _, upcoming, _, utc_offsets, times, _ = state
+    for index in range(upcoming, len(times)):
+        if times[index] > now:
+            return PRAYERS[index % len(PRAYERS)], times[index], utc_offsets[index // len(PRAYERS)]
+    return None
+
+
+def main():
+    state = read_state()
+    if state is None or not is_running(state[5]):
+        print("Athany isn't running", file=sys.stderr)
+        return 1
+
+    now = time.time()
+    upcoming = upcoming_prayer(state, now)
+    if upcoming is None:
+        print("The state file is outdated", file=sys.stderr)
+        return 1
+
+    name, epoch, utc_offset = upcoming
+    remaining = epoch - int(now)
+    if "--json" in sys.argv[1:]:
+        print(f'{{"prayer": "{name}", "epoch": {epoch}, "remaining": {remaining}}}')
+    else:
+        local_time = time.strftime("%I:%M %p", time.gmtime(epoch + utc_offset))
+        print(f"{name} {local_time} in {remaining // 3600}:{remaining // 60 % 60:02}:{remaining % 60:02}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
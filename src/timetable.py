@@ -0,0 +1,306 @@
+"""
+module for precomputing a whole year of prayer times into a memory-mapped timetable file
+"""
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import datetime
+import importlib.util
+from collections import Counter
+
+from adhanpy.PrayerTimes import PrayerTimes
+from adhanpy.calculation import CalculationParameters
+
+DATA_DIR = os.path.join(os.path.dirname(
+    os.path.abspath(__file__)), "Data")
+TIMETABLES_DIR = os.path.join(DATA_DIR, "Timetables")
+
+PRAYERS = ("Fajr", "Sunrise", "Dhuhr", "Asr", "Maghrib", "Isha")
+
+# file layout: header followed by one record per day of the year (starting at Jan 1st),
+# each record holds the epoch seconds of the 6 prayers as little-endian int64 (so times after 2038
+# fit) & the crc32 of these 48 bytes, the times are stored unrounded & without the user's prayer
+# offsets, which are added on lookup before rounding to the minute like adhanpy does
+MAGIC = b"ATTB"
+VERSION = 5
+HEADER = struct.Struct("<4sHHI16s")  # magic, version, year, number of days, key digest
+TIMES = struct.Struct(f"<{len(PRAYERS)}q")
+RECORD = struct.Struct(f"<{len(PRAYERS)}qI")
+
+# timetables of other calculation keys (e.g. a previously used method) are kept so switching back
+# doesn't recalculate them, the least recently used files are removed above this limit (~19 KB each)
+MAX_TIMETABLES = 16
+
+# paths of the timetable files mapped by any Timetable of the process (e.g. the main location &
+# the monitored ones) with the number of instances mapping them, these are never evicted
+_mapped = Counter()
+
+
+def pack_record(times) -> bytes:
+    """
+    :param list[int] times: epoch seconds of the 6 prayers
+    :return bytes: timetable record of the times with their checksum
+    """
+    data = TIMES.pack(*(int(time) for time in times))
+    return data + struct.pack("<I", zlib.crc32(data))
+
+
+def rounded_minute(time: int) -> int:
+    """
+    :param int time: epoch seconds
+    :return int: the time rounded to the nearest minute like adhanpy,
+    which drops the seconds instead of rounding up when the minute is 59
+    """
+    seconds = time % 60
+    if seconds > 30 and time // 60 % 60 != 59:
+        return time - seconds + 60
+    return time - seconds
+
+
+class UnroundedPrayerTimes(PrayerTimes):
+    """adhanpy PrayerTimes that keeps the seconds of the adjusted prayer times"""
+
+    def _rounded_minute(self, adjustments, method_adjustments, prayer_name, temp_prayer):
+        return temp_prayer + datetime.timedelta(minutes=getattr(adjustments, prayer_name)
+                                                + getattr(method_adjustments, prayer_name))
+
+
+def adhanpy_times(dates, locations, params: CalculationParameters, rounded: bool = True):
+    """calculation backend that runs the adhanpy PrayerTimes astronomy for each date & location
+
+    :param list[datetime.date] dates: dates to calculate the prayer times for
+    :param list[tuple[float, float]] locations: (latitude, longitude) pairs
+    :param CalculationParameters params: calculation method parameters
+    :param bool rounded: whether to round the times to the nearest minute
+    :return list[list[tuple[int]]]: epoch seconds of the 6 prayers indexed by [date][location]
+    """
+    prayer_times = PrayerTimes if rounded else UnroundedPrayerTimes
+    rows = []
+    for date in dates:
+        row = []
+        for coords in locations:
+            times = prayer_times(coords, datetime.datetime(date.year, date.month, date.day),
+                                 calculation_parameters=params)
+            row.append(tuple(int(getattr(times, prayer.lower()).timestamp())
+                             for prayer in PRAYERS))
+        rows.append(row)
+
+    return rows
+
+
+def numpy_times(dates, locations, params: CalculationParameters, rounded: bool = True):
+    """calculation backend that computes all dates & locations in one vectorized pass (requires numpy)
+
+    :return np.ndarray: epoch seconds of the 6 prayers indexed by [date][location]
+    """
+    from src.solar import prayer_times
+    return prayer_times(dates, locations, params, rounded)
+
+
+BACKENDS = {"adhanpy": adhanpy_times, "numpy": numpy_times}
+
+
+def available_backend(name: str) -> str:
+    """
+    :param str name: name of the preferred calculation backend
+    :return str: the given backend if it can be used, otherwise the default adhanpy backend
+    """
+    if name == "numpy" and importlib.util.find_spec("numpy") is not None:
+        return name
+    return "adhanpy"
+
+
+def calculation_key(coords, timezone: str, method_id: int, custom_angles,
+                    backend: str = "adhanpy") -> bytes:
+    """function to get the cache key of a timetable from every input that affects the calculation,
+    prayer offsets aren't part of the key as they're applied to the stored times on lookup
+
+    :param tuple[float, float] coords: (latitude, longitude) of the location
+    :param str timezone: IANA timezone name of the location
+    :param int method_id: id of the used calculation method
+    :param list[float] custom_angles: [fajr angle, isha angle] used by the custom method
+    :param str backend: name of the calculation backend
+    :return bytes: 16 bytes digest identifying the calculation inputs
+    """
+    inputs = json.dumps([list(coords), timezone, method_id, list(custom_angles), backend])
+    return hashlib.sha1(inputs.encode("utf-8")).digest()[:16]
+
+
+class Timetable:
+    """class that provides O(1) lookup of the prayer times of any date
+    from yearly timetable files that are built once per calculation key,
+    changing the prayer offsets doesn't rebuild the timetable & the files of
+    the last MAX_TIMETABLES keys/years stay cached on disk"""
+
+    def __init__(self, coords, key: bytes, params: CalculationParameters,
+                 backend: str = "adhanpy", cache_dir=TIMETABLES_DIR):
+        self.coords = coords
+        self.key = key
+        self.params = params
+        self.backend = BACKENDS[backend]
+        self.cache_dir = cache_dir
+        self.offsets = (0,) * len(PRAYERS)  # seconds added to each prayer
+        self._years = {}
+        self._mapped_years = set()  # years of _years mapped from a file (not kept in memory)
+
+    def set_offsets(self, minutes):
+        """method to set the prayer offsets added to the looked up times
+
+        :param list[int] minutes: offset of Fajr, Sunrise, Dhuhr, Asr, Maghrib & Isha in minutes
+        """
+        self.offsets = tuple(60 * int(offset) for offset in minutes)
+
+    def _path(self, year: int) -> str:
+        return os.path.join(self.cache_dir, f"timetable-{year}-{self.key.hex()}.dat")
+
+    def calculate_year(self, year: int) -> bytes:
+        """method to calculate the prayer times of every day in the given year
+
+        :param int year: year to calculate the timetable for
+        :return bytes: contents of the timetable file of the year
+        """
+        start = datetime.date(year, 1, 1)
+        days = (datetime.date(year + 1, 1, 1) - start).days
+
+        dates = [start + datetime.timedelta(days=day) for day in range(days)]
+
+        data = bytearray(HEADER.pack(MAGIC, VERSION, year, days, self.key))
+        for row in self.backend(dates, [self.coords], self.params, rounded=False):
+            data += pack_record(row[0])
+
+        return bytes(data)
+
+    def build_year(self, year: int) -> bytes:
+        """method to calculate the prayer times of every day in the given year & save them to disk
+
+        :param int year: year to build the timetable for
+        :return bytes: contents of the timetable file of the year
+        :raises OSError: if the timetable file couldn't be written
+        """
+        data = self.calculate_year(year)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self._path(year) + ".tmp"
+        with open(tmp_path, "wb") as table_file:
+            table_file.write(data)
+        os.replace(tmp_path, self._path(year))
+
+        self.evict()
+        return data
+
+    def evict(self, max_timetables: int = MAX_TIMETABLES):
+        """method to remove the least recently used timetable files above the given limit,
+        the modification time of a file is its last use as it's touched whenever it's opened
+
+        :param int max_timetables: number of timetable files to keep
+        """
+        try:
+            tables = [entry for entry in os.scandir(self.cache_dir)
+                      if entry.name.startswith("timetable-") and entry.name.endswith(".dat")]
+            tables.sort(key=lambda entry: entry.stat().st_mtime_ns, reverse=True)
+        except OSError:
+            return
+
+        for entry in tables[max_timetables:]:
+            if _mapped[entry.path] == 0:
+                try:
+                    os.remove(entry.path)
+                except OSError:  # still mapped by another instance (Windows)
+                    pass
+
+    def _open_year(self, year: int):
+        """map the timetable file of the given year, returns None if it is missing or invalid"""
+        try:
+            with open(self._path(year), "rb") as table_file:
+                table = mmap.mmap(table_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        if len(table) >= HEADER.size:
+            magic, version, table_year, days, key = HEADER.unpack_from(table)
+            if (magic, version, table_year, key) == (MAGIC, VERSION, year, self.key) \
+                    and len(table) == HEADER.size + days * RECORD.size:
+                try:
+                    os.utime(self._path(year))  # mark it as recently used
+                except OSError:
+                    pass
+                return table
+
+        table.close()
+        return None
+
+    def _year_table(self, year: int):
+        table = self._years.get(year)
+        if table is None:
+            table = self._open_year(year)
+            if table is None:
+                try:
+                    data = self.build_year(year)
+                except OSError as error:
+                    print(f"[DEBUG] Couldn't save the {year} timetable: {error}", file=sys.stderr)
+                    data = self.calculate_year(year)
+                table = self._open_year(year)
+            if table is None:  # the cache directory isn't usable, keep the timetable in memory
+                table = mmap.mmap(-1, len(data))
+                table.write(data)
+            else:
+                _mapped[self._path(year)] += 1
+                self._mapped_years.add(year)
+            self._years[year] = table
+
+        return table
+
+    def base_times(self, date: datetime.date) -> tuple:
+        """method to get the unrounded prayer times of the given date without the prayer offsets
+
+        :param datetime.date date: date to get the prayer times for
+        :return tuple[int]: epoch seconds of Fajr, Sunrise, Dhuhr, Asr, Maghrib & Isha
+        """
+        table = self._year_table(date.year)
+        position = HEADER.size + RECORD.size * (
+            date.toordinal() - datetime.date(date.year, 1, 1).toordinal())
+        *times, checksum = RECORD.unpack_from(table, position)
+        if zlib.crc32(table[position:position + TIMES.size]) != checksum:
+            return self._repair_day(date, position)
+
+        return tuple(times)
+
+    def _repair_day(self, date: datetime.date, position: int) -> tuple:
+        """recalculate the prayer times of a corrupted record & write them back to the timetable file"""
+        print(f"[DEBUG] Corrupted timetable record for {date}, recalculating it", file=sys.stderr)
+        times = tuple(int(time) for time in
+                      self.backend([date], [self.coords], self.params, rounded=False)[0][0])
+        try:
+            with open(self._path(date.year), "r+b") as table_file:
+                table_file.seek(position)
+                table_file.write(pack_record(times))
+        except OSError:  # e.g. an in-memory timetable, it's recalculated again on the next lookup
+            pass
+
+        return times
+
+    def times(self, date: datetime.date) -> tuple:
+        """method to get the prayer times of the given date with the prayer offsets applied,
+        the offsets are added before rounding so the times match adhanpy's adjusted ones
+
+        :param datetime.date date: date to get the prayer times for
+        :return tuple[int]: epoch seconds of Fajr, Sunrise, Dhuhr, Asr, Maghrib & Isha
+        """
+        return tuple(rounded_minute(time + offset) for time, offset
+                     in zip(self.base_times(date), self.offsets))
+
+    def close(self):
+        """method to unmap all opened timetable files"""
+        for table in self._years.values():
+            table.close()
+        for year in self._mapped_years:
+            path = self._path(year)
+            _mapped[path] -= 1
+            if _mapped[path] <= 0:
+                del _mapped[path]
+        self._years.clear()
+        self._mapped_years.clear()
@@ -4,8 +4,11 @@ module for translating UI into a given language
 import os
 import sys
 import json
-import arabic_reshaper
-from bidi.algorithm import get_display
+import hashlib
+import functools
+
+# bump when the way catalog entries are shaped changes to invalidate saved catalogs
+CATALOG_VERSION = 1
 
 
 class Translator:
@@ -19,23 +22,63 @@ class Translator:
         if lang == 'ar':
             self.bidirectional = True
         if lang != 'en':
-            self.translation_dict = json.load(
-                open(os.path.join(trans_files_dir, lang+'_trans.json'), 'r', encoding='utf-8'))
+            self.translation_dict = self.load_catalog(trans_files_dir)
 
     # ------------------------------------- UI Translation methods ------------------------------- #
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def display_ar_text(text: str) -> str:
         """
         :param text: (str) arabic text to display correctly
         :return: (str) correctly formatted arabic string
         """
         if sys.platform != "win32":
+            # imported here so that only arabic text pays for loading the shaping libraries
+            import arabic_reshaper
+            from bidi.algorithm import get_display
+
             ar_txt = arabic_reshaper.reshape(text)
             bidi_txt = get_display(ar_txt)
             return bidi_txt
         else:
             return text
 
+    def load_catalog(self, trans_files_dir: str) -> dict:
+        """method to load the translation catalog of the translator language,
+        for bidirectional languages every entry is reshaped & bidi-ordered once
+        and the result is saved next to the translation file for the following runs
+
+        :param str trans_files_dir: directory containing the translation files
+        :return dict: translation catalog ready to be displayed
+        """
+        with open(os.path.join(trans_files_dir, self.lang+'_trans.json'), 'rb') as trans_file:
+            source = trans_file.read()
+
+        if not self.bidirectional:
+            return json.loads(source)
+
+        digest = f"{CATALOG_VERSION}-{sys.platform == 'win32'}-{hashlib.sha1(source).hexdigest()}"
+        cache_path = os.path.join(trans_files_dir, self.lang+'_trans.cache.json')
+        try:
+            with open(cache_path, encoding='utf-8') as cache_file:
+                cached = json.load(cache_file)
+            if cached["digest"] == digest:
+                return cached["entries"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        entries = {sentence: self.display_ar_text(translation)
+                   for sentence, translation in json.loads(source).items()}
+        try:
+            with open(cache_path+'.tmp', 'w', encoding='utf-8') as cache_file:
+                json.dump({"digest": digest, "entries": entries},
+                          cache_file, ensure_ascii=False)
+            os.replace(cache_path+'.tmp', cache_path)
+        except OSError:  # read-only install, the catalog is rebuilt on next start
+            pass
+
+        return entries
+
     def translate(self, sentence):
         """method to translate the given string in the language of the translator object
         :param str sentence: string to translate
@@ -44,8 +87,7 @@ class Translator:
         if not self.translation_dict:
             text = sentence
         else:
-            text = self.display_ar_text(
-                self.translation_dict[sentence]) if self.bidirectional else self.translation_dict[sentence]
+            text = self.translation_dict[sentence]
 
         return text
 
@@ -0,0 +1,34 @@
+"""tests of the vectorized prayer times calculation against the adhanpy backend"""
+import datetime
+
+import pytest
+from adhanpy.calculation import CalculationMethod, CalculationParameters
+
+from src.timetable import adhanpy_times, numpy_times
+
+LOCATIONS = [(30.0444, 31.2357), (51.5072, -0.1276), (-6.2088, 106.8456), (21.4225, 39.8262)]
+# not consecutive & not sorted, each date needs the sunrise of its own following day
+DATES = [datetime.date(2023, 3, 1), datetime.date(2023, 6, 21), datetime.date(2024, 2, 29),
+         datetime.date(2023, 12, 31), datetime.date(2023, 1, 1), datetime.date(2023, 9, 15)]
+
+
+@pytest.mark.parametrize("method", [CalculationMethod.EGYPTIAN, CalculationMethod.MUSLIM_WORLD_LEAGUE,
+                                    CalculationMethod.UMM_AL_QURA,
+                                    CalculationMethod.MOON_SIGHTING_COMMITTEE])
+def test_non_consecutive_dates_match_adhanpy(method):
+    params = CalculationParameters(method=method)
+    expected = adhanpy_times(DATES, LOCATIONS, params)
+    actual = numpy_times(DATES, LOCATIONS, params)
+
+    for date_index, row in enumerate(expected):
+        for location_index, times in enumerate(row):
+            for prayer_time, expected_time in zip(actual[date_index][location_index], times):
+                # adhanpy rounds to the minute, allow one minute for floating point differences
+                assert abs(int(prayer_time) - expected_time) <= 60
+
+
+def test_single_date_matches_adhanpy():
+    params = CalculationParameters(method=CalculationMethod.EGYPTIAN)
+    date = [datetime.date(2023, 7, 4)]
+    assert [list(map(int, times)) for times in numpy_times(date, LOCATIONS, params)[0]] \
+        == [list(times) for times in adhanpy_times(date, LOCATIONS, params)[0]]
@@ -0,0 +1,68 @@
+"""tests of the yearly timetable files"""
+import os
+import datetime
+
+import pytest
+from adhanpy.calculation import CalculationMethod, CalculationParameters
+
+from src.timetable import MAX_TIMETABLES, Timetable, adhanpy_times, calculation_key
+
+COORDS = (30.0444, 31.2357)
+PARAMS = CalculationParameters(method=CalculationMethod.EGYPTIAN)
+
+
+def timetable(cache_dir, backend: str = "numpy") -> Timetable:
+    key = calculation_key(COORDS, "Africa/Cairo", 5, [0, 0], backend)
+    return Timetable(COORDS, key, PARAMS, backend, cache_dir=str(cache_dir))
+
+
+def test_times_after_2038(tmp_path):
+    table = timetable(tmp_path)
+    for date in (datetime.date(2038, 1, 18), datetime.date(2038, 1, 20)):
+        assert table.times(date) == adhanpy_times([date], [COORDS], PARAMS)[0][0]
+    table.close()
+
+
+@pytest.mark.parametrize("backend", ["adhanpy", "numpy"])
+def test_offsets_match_adhanpy_adjustments(tmp_path, backend):
+    offsets = [1, -2, 3, 0, 2, -1]
+    params = CalculationParameters(method=CalculationMethod.EGYPTIAN)
+    for prayer, offset in zip(("fajr", "sunrise", "dhuhr", "asr", "maghrib", "isha"), offsets):
+        setattr(params.adjustments, prayer, offset)
+
+    table = timetable(tmp_path, backend)
+    table.set_offsets(offsets)
+    dates = [datetime.date(2023, 1, 1) + datetime.timedelta(days=day) for day in range(365)]
+    # the offsets are added before rounding, so the days where adhanpy drops the seconds of
+    # a time shifted into minute :59 match too
+    assert [table.times(date) for date in dates] \
+        == [row[0] for row in adhanpy_times(dates, [COORDS], params)]
+    table.close()
+
+
+def test_unusable_cache_dir_keeps_the_timetable_in_memory(tmp_path):
+    cache_dir = tmp_path / "not-a-directory"
+    cache_dir.write_bytes(b"")
+    table = timetable(cache_dir)
+    date = datetime.date(2023, 5, 1)
+    assert table.times(date) == adhanpy_times([date], [COORDS], PARAMS)[0][0]
+    table.close()
+
+
+def test_eviction_keeps_the_files_of_every_open_timetable(tmp_path):
+    date = datetime.date(2023, 5, 1)
+    first = timetable(tmp_path)
+    first.times(date)
+    path = first._path(date.year)
+
+    # another location builds more timetables than the cache keeps
+    for index in range(MAX_TIMETABLES + 2):
+        key = calculation_key((index, index), "UTC", 5, [0, 0], "numpy")
+        other = Timetable((index, index), key, PARAMS, "numpy", cache_dir=str(tmp_path))
+        other.times(date)
+        other.close()
+    assert os.path.exists(path)
+
+    first.close()
+    other.build_year(2024)
+    assert not os.path.exists(path)
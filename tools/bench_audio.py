@@ -0,0 +1,91 @@
+"""
+benchmark the CPU cost of playing athans with the old fixed 16 kHz output
+& the native format output used by the audio player, run from the repository root:
+
+    python tools/bench_audio.py [--seconds 5] [--driver dummy] [ATHAN ...]
+
+every case runs in a fresh process & reports the CPU time spent per second of played audio,
+the one-time decode of the pre-decoded cases is reported separately as it happens before prayer time
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from src.audio import probe, source  # noqa: E402
+from src.catalog import get_catalog  # noqa: E402
+
+# (name, output format, pre-decoded)
+CASES = (("stream @ 16 kHz", (16000, 2), False),  # the original mixer.music path
+         ("decoded @ 16 kHz", (16000, 2), True),
+         ("stream @ native", None, False),
+         ("decoded @ native", None, True))  # the audio player path
+
+
+def run_case(path: str, audio_format, decoded: bool, seconds: float, results):
+    """play the file for the given number of seconds & put (decode ms, playback cpu ms/s) in results"""
+    os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    from pygame import mixer
+
+    rate, channels = audio_format or probe(path)
+    mixer.init(frequency=rate, channels=channels)
+
+    decode_ms = 0.0
+    audio_file, codec = source(path)
+    started = time.process_time()
+    if decoded:
+        sound = mixer.Sound(file=audio_file)
+        decode_ms = (time.process_time() - started) * 1000
+        started = time.process_time()
+        sound.play()
+    else:
+        mixer.music.load(audio_file, codec)
+        mixer.music.play()
+
+    time.sleep(seconds)
+    results.put((decode_ms, (time.process_time() - started) * 1000 / seconds))
+    mixer.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("athans", nargs="*",
+                        help="athan filenames or paths (default: one athan of each native format)")
+    parser.add_argument("--seconds", type=float, default=5,
+                        help="seconds of audio to play for each case")
+    parser.add_argument("--driver", help="SDL audio driver (e.g. dummy when there's no sound card)")
+    args = parser.parse_args()
+
+    if args.driver:
+        os.environ["SDL_AUDIODRIVER"] = args.driver
+
+    athans = get_catalog()
+    paths = [name if os.path.exists(name) else athans.path(name) for name in args.athans]
+    if not paths:
+        formats = {}
+        for athan in athans:
+            if athan.available and not athan.takbeer:
+                formats.setdefault(probe(athans.path(athan.filename)), athans.path(athan.filename))
+        paths = list(formats.values())
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    print(f"{'athan':<32} {'format':>14} {'case':<18} {'decode (ms)':>12} {'cpu ms/s':>9}")
+    for path in paths:
+        rate, channels = probe(path)
+        for name, audio_format, decoded in CASES:
+            process = context.Process(target=run_case,
+                                      args=(path, audio_format, decoded, args.seconds, results))
+            process.start()
+            decode_ms, cpu = results.get()
+            process.join()
+            print(f"{os.path.basename(path)[:32]:<32} {f'{rate} Hz/{channels}ch':>14} "
+                  f"{name:<18} {decode_ms:>12.1f} {cpu:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
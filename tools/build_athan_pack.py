@@ -0,0 +1,144 @@
+"""
+build the athans pack (src/Data/athans.pack) from the source recordings in assets/athans,
+run from the repository root after installing the build-only dependency:
+
+    pip install soundfile
+    python tools/build_athan_pack.py [--quality 0.8]
+
+every recitation is stored once, its takbeer-only athan is verified to be a prefix of the full
+recording & stored as a cut point, recordings are transcoded to Ogg Vorbis unless the source MP3
+is already smaller (e.g. the low bitrate 11 kHz mono recordings)
+"""
+import os
+import io
+import sys
+import argparse
+
+import numpy
+import soundfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from src.catalog import get_catalog  # noqa: E402
+from src.pack import (PACK_FILE, MAGIC, VERSION, HEADER, ENTRY, CODECS,  # noqa: E402
+                      BLOCK_SIZE)
+
+SOURCE_DIR = os.path.join(ROOT_DIR, "assets", "athans")
+TAKBEER_SUFFIX = "_(Takbeer_only)"
+# largest RMS difference (relative to the takbeer loudness) for the takbeer to count as a prefix,
+# some takbeer files were encoded separately from their full recording
+MAX_PREFIX_ERROR = 0.05
+# libsndfile crashes when a whole recording is written to a vorbis stream at once
+WRITE_BLOCK = 4096
+
+
+def decode(filename: str):
+    """
+    :param str filename: source recording in the source directory
+    :return tuple[numpy.ndarray, int]: float32 frames (frames x channels) & sample rate
+    """
+    return soundfile.read(os.path.join(SOURCE_DIR, filename), dtype="float32", always_2d=True)
+
+
+def encode(filename: str, quality: float):
+    """
+    :param str filename: source recording in the source directory
+    :param float quality: vorbis compression level from 0 (best quality) to 1 (smallest)
+    :return tuple[bytes, str, int, int]: the smaller of the vorbis & source encodings,
+    its codec, sample rate & number of channels
+    """
+    frames, rate = decode(filename)
+    vorbis = io.BytesIO()
+    with soundfile.SoundFile(vorbis, "w", rate, frames.shape[1], format="OGG",
+                             subtype="VORBIS", compression_level=quality) as ogg_file:
+        for start in range(0, len(frames), WRITE_BLOCK):
+            ogg_file.write(frames[start:start + WRITE_BLOCK])
+
+    with open(os.path.join(SOURCE_DIR, filename), "rb") as source:
+        original = source.read()
+
+    if len(vorbis.getvalue()) < len(original):
+        return vorbis.getvalue(), "ogg", rate, frames.shape[1]
+    return original, "mp3", rate, frames.shape[1]
+
+
+def takbeer_cut(takbeer: str, full: str):
+    """
+    :param str takbeer: takbeer-only recording
+    :param str full: full recording of the same recitation
+    :return int: number of frames of the full recording to play for the takbeer-only athan,
+    None if the takbeer isn't a prefix of the full recording
+    """
+    takbeer_frames, takbeer_rate = decode(takbeer)
+    full_frames, full_rate = decode(full)
+    if takbeer_rate != full_rate or takbeer_frames.shape[1] != full_frames.shape[1] \
+            or len(takbeer_frames) > len(full_frames):
+        return None
+
+    difference = takbeer_frames - full_frames[:len(takbeer_frames)]
+    loudness = numpy.sqrt(numpy.mean(takbeer_frames ** 2)) or 1.0
+    if numpy.sqrt(numpy.mean(difference ** 2)) / loudness > MAX_PREFIX_ERROR:
+        return None
+
+    return len(takbeer_frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quality", type=float, default=0.8,
+                        help="vorbis compression level from 0 (best quality) to 1 (smallest)")
+    args = parser.parse_args()
+
+    filenames = [athan.filename for athan in get_catalog()]
+    blobs = []  # (data, codec, rate, channels)
+    entries = []  # (filename, blob index, frames)
+    blob_of = {}
+    for filename in sorted(filenames, key=lambda name: TAKBEER_SUFFIX in name):
+        full = filename.replace(TAKBEER_SUFFIX, "")
+        cut = None
+        if full != filename and full in blob_of:
+            cut = takbeer_cut(filename, full)
+            if cut is None:
+                print(f"{filename} isn't a prefix of {full}, storing it separately")
+
+        if cut is None:
+            blob_of[filename] = len(blobs)
+            blobs.append(encode(filename, args.quality))
+            entries.append((filename, blob_of[filename], 0))
+        else:
+            entries.append((filename, blob_of[full], cut))
+
+    # keep the catalog order in the index
+    entries.sort(key=lambda entry: filenames.index(entry[0]))
+
+    index_size = HEADER.size + sum(ENTRY.size + len(name.encode("utf-8")) for name, *_ in entries)
+    offsets, position = [], -(-index_size // BLOCK_SIZE) * BLOCK_SIZE
+    for data, *_ in blobs:
+        offsets.append(position)
+        position += -(-len(data) // BLOCK_SIZE) * BLOCK_SIZE
+
+    temp_file = PACK_FILE + ".tmp"
+    with open(temp_file, "wb") as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, VERSION, len(entries)))
+        for filename, blob, frames in entries:
+            data, codec, rate, channels = blobs[blob]
+            name = filename.encode("utf-8")
+            pack_file.write(ENTRY.pack(offsets[blob], len(data), rate, frames,
+                                       channels, CODECS.index(codec), len(name)))
+            pack_file.write(name)
+
+        for offset, (data, *_) in zip(offsets, blobs):
+            pack_file.write(b"\0" * (offset - pack_file.tell()))
+            pack_file.write(data)
+    os.replace(temp_file, PACK_FILE)
+
+    source_size = sum(os.path.getsize(os.path.join(SOURCE_DIR, filename)) for filename in filenames)
+    vorbis = sum(1 for blob in blobs if blob[1] == "ogg")
+    print(f"{len(entries)} athans ({len(blobs)} recordings, {vorbis} transcoded to vorbis) "
+          f"written to {PACK_FILE}: {os.path.getsize(PACK_FILE) / 1024 ** 2:.1f} MB "
+          f"(sources: {source_size / 1024 ** 2:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+build the athans catalog manifest (src/Data/athans_manifest.json),
+run from the repository root after replacing files in assets/athans:
+
+    python tools/build_athans_manifest.py [--add FILENAME ...]
+
+the size, hash & duration of every athan in the manifest are refreshed from the files on disk,
+new athans are appended to the catalog with --add (their display name is derived from the filename)
+"""
+import os
+import sys
+import json
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from src.catalog import MANIFEST_FILE, MANIFEST_VERSION, probe_mp3  # noqa: E402
+from src.downloads import file_digest  # noqa: E402
+
+SOURCE_DIR = os.path.join(ROOT_DIR, "assets", "athans")
+
+
+def catalog_entry(filename: str, name: str) -> dict:
+    """
+    :param str filename: athan filename in the source directory
+    :param str name: display name of the athan
+    :return dict: manifest entry of the athan
+    """
+    path = os.path.join(SOURCE_DIR, filename)
+    size, digest = file_digest(path)
+    duration = probe_mp3(path)[0]
+    return {"name": name, "filename": filename, "size": size, "sha256": digest.hexdigest(),
+            "duration": round(duration, 2), "takbeer": "(Takbeer_only)" in filename}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--add", nargs="+", default=[], metavar="FILENAME",
+                        help="athans to append to the catalog")
+    args = parser.parse_args()
+
+    with open(MANIFEST_FILE, encoding="utf-8") as manifest_file:
+        athans = json.load(manifest_file)["athans"]
+
+    names = [(athan["filename"], athan["name"]) for athan in athans]
+    names += [(filename, filename[:-4].replace("_", " ")) for filename in args.add]
+
+    manifest = {"version": MANIFEST_VERSION,
+                "athans": [catalog_entry(filename, name) for filename, name in names]}
+    with open(MANIFEST_FILE, mode="w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+        manifest_file.write("\n")
+
+    print(f"{len(names)} athans written to {MANIFEST_FILE}")
+
+
+if __name__ == "__main__":
+    main()
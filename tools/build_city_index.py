@@ -0,0 +1,114 @@
+"""
+build the offline city index (src/Data/cities.dat) from the GeoNames cities15000 dump,
+run from the repository root after installing the build-only dependency:
+
+    pip install geonamescache
+    python tools/build_city_index.py
+"""
+import os
+import re
+import sys
+import unicodedata
+
+import geonamescache
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.geocoding import (CITY_INDEX_FILE, MAGIC, VERSION, HEADER, OFFSET, RECORD,  # noqa: E402
+                           COORDINATES_SCALE, city_key)
+
+# default calculation method of each country (aladhan api method ids),
+# countries that are not listed use the Muslim World League method
+DEFAULT_METHOD = 3
+COUNTRY_METHODS = {
+    **dict.fromkeys(["PK", "IN", "BD", "AF"], 1),
+    **dict.fromkeys(["US", "CA"], 2),
+    **dict.fromkeys(["SA", "YE", "BH", "OM", "AE"], 4),
+    **dict.fromkeys(["EG", "SD", "LY", "SY", "LB", "IQ", "PS", "JO"], 5),
+    "KW": 9,
+    "QA": 10,
+    **dict.fromkeys(["SG", "MY", "ID", "BN"], 11),
+    "FR": 12,
+}
+COUNTRY_ALIASES = {"usa": "US", "uk": "GB", "uae": "AE", "ksa": "SA"}
+
+# alternate (ascii) names are only indexed for big cities to keep the index small,
+# e.g. "New York" for "New York City" & "Mecca" for "Makkah"
+ALTERNATE_NAMES_POPULATION = 1000000
+ASCII_NAME = re.compile(r"^[A-Za-z][A-Za-z .'-]*$")
+
+
+def fold_accents(text: str) -> str:
+    """
+    :param str text: text to fold
+    :return str: the text without combining accents (e.g. São Paulo -> Sao Paulo)
+    """
+    return "".join(char for char in unicodedata.normalize("NFKD", text)
+                   if not unicodedata.combining(char))
+
+
+def main():
+    cache = geonamescache.GeonamesCache()
+
+    # most populated cities first so they win when a country has several cities with one name
+    cities = sorted(cache.get_cities().values(),
+                    key=lambda city: -city["population"])
+    records = [(city, (round(city["latitude"] * COORDINATES_SCALE),
+                       round(city["longitude"] * COORDINATES_SCALE),
+                       city["timezone"],
+                       COUNTRY_METHODS.get(city["countrycode"], DEFAULT_METHOD)))
+               for city in cities]
+
+    entries = {}
+    for city, record in records:
+        for name in {city["name"], fold_accents(city["name"])}:
+            entries.setdefault(city_key(name, city["countrycode"]), record)
+
+    # added after all the main names so they never shadow the main name of another city
+    for city, record in records:
+        if city["population"] >= ALTERNATE_NAMES_POPULATION:
+            for name in city["alternatenames"]:
+                if ASCII_NAME.match(name):
+                    entries.setdefault(
+                        city_key(name, city["countrycode"]), record)
+
+    keys = sorted(entries)
+    timezones = sorted({record[2] for record in entries.values()})
+    timezone_ids = {name: index for index, name in enumerate(timezones)}
+
+    key_offsets, key_blob = [0], bytearray()
+    for key in keys:
+        key_blob += key
+        key_offsets.append(len(key_blob))
+
+    tz_offsets, tz_blob = [0], bytearray()
+    for name in timezones:
+        tz_blob += name.encode("utf-8")
+        tz_offsets.append(len(tz_blob))
+
+    countries = dict(COUNTRY_ALIASES)
+    for code, country in cache.get_countries().items():
+        countries[country["name"].lower()] = code
+        countries[country["iso3"].lower()] = code
+        countries[code.lower()] = code
+
+    data = bytearray(HEADER.pack(MAGIC, VERSION, len(keys), len(timezones),
+                                 len(key_blob), len(tz_blob)))
+    data += b"".join(OFFSET.pack(offset) for offset in key_offsets)
+    data += key_blob
+    for key in keys:
+        latitude, longitude, timezone, method = entries[key]
+        data += RECORD.pack(latitude, longitude, timezone_ids[timezone], method)
+    data += b"".join(OFFSET.pack(offset) for offset in tz_offsets)
+    data += tz_blob
+    data += "".join(f"{name}\t{code}\n" for name,
+                    code in sorted(countries.items())).encode("utf-8")
+
+    with open(CITY_INDEX_FILE, "wb") as index_file:
+        index_file.write(data)
+
+    print(f"{len(keys)} cities, {len(timezones)} timezones, "
+          f"{len(data) // 1024} KB written to {CITY_INDEX_FILE}")
+
+
+if __name__ == "__main__":
+    main()
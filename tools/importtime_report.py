@@ -0,0 +1,71 @@
+"""
+summarize `python -X importtime` for the application startup imports,
+run from the repository root:
+
+    python tools/importtime_report.py [--module src.athany] [--top 15] [--budget 300]
+
+exits with status 1 if the total import time exceeds the budget (in ms)
+"""
+import os
+import sys
+import argparse
+import subprocess
+from collections import defaultdict
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(code: str) -> list:
+    """run a fresh interpreter with -X importtime
+
+    :param str code: code to run (e.g. "import src.athany")
+    :return list[tuple[int, int, int, str]]: (depth, self us, cumulative us, module name) entries
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((depth, int(self_us), int(cumulative_us), name.strip()))
+
+    return entries
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="src.athany",
+                        help="module to measure (default: src.athany)")
+    parser.add_argument("--top", type=int, default=15,
+                        help="number of packages to list")
+    parser.add_argument("--budget", type=float,
+                        help="fail if the total import time exceeds this many ms")
+    args = parser.parse_args()
+
+    # modules imported by the bare interpreter (site & friends) are not part of the startup cost
+    baseline = {entry[3] for entry in measure("pass")}
+    entries = [entry for entry in measure(f"import {args.module}")
+               if entry[3] not in baseline]
+    total_ms = sum(entry[2] for entry in entries if entry[0] == 0) / 1000
+
+    packages = defaultdict(int)
+    for _, self_us, _, name in entries:
+        packages[name.split(".")[0]] += self_us
+
+    print(f"import {args.module}: {total_ms:.1f} ms total\n")
+    print(f"{'package':<30} {'self (ms)':>10}")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<30} {self_us / 1000:>10.1f}")
+
+    if args.budget is not None and total_ms > args.budget:
+        print(f"\nimport time budget exceeded: {total_ms:.1f} ms > {args.budget} ms")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())